@@ -2,17 +2,22 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import cv2
 import os
+import shutil
 import sqlite3
 import numpy as np
 from PIL import Image, ImageTk, ImageDraw
 import datetime
+import functools
 import time
 import threading
 import random
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import queue
+from concurrent.futures import ThreadPoolExecutor
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import winsound
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
 
 # Configuration  
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -20,10 +25,28 @@ TRAINING_IMAGE_DIR = os.path.join(BASE_DIR, "TrainingImage")
 STUDENT_DB_PATH = os.path.join(BASE_DIR, "StudentDetails", "student_database.db")
 TRAINNER_PATH = os.path.join(TRAINING_IMAGE_DIR, "Trainner.yml")
 HAARCASCADE_PATH = os.path.join(BASE_DIR, "haarcascade_frontalface_default.xml")
+YUNET_MODEL_PATH = os.path.join(BASE_DIR, "face_detection_yunet.onnx")
+EMBEDDER_MODEL_PATH = os.path.join(BASE_DIR, "face_recognition_sface_2021dec.onnx")
+TRAINING_FACES_PATH = os.path.join(TRAINING_IMAGE_DIR, "faces.npy")
+TRAINING_IDS_PATH = os.path.join(TRAINING_IMAGE_DIR, "face_ids.npy")
+EMBEDDINGS_PATH = os.path.join(TRAINING_IMAGE_DIR, "embeddings.npy")
+EMBEDDING_IDS_PATH = os.path.join(TRAINING_IMAGE_DIR, "ids.npy")
 ATTENDANCE_DIR = os.path.join(BASE_DIR, "Attendance")
 UNKNOWN_IMAGES_DIR = os.path.join(BASE_DIR, "ImagesUnknown")
 SOUNDS_DIR = os.path.join(BASE_DIR, "Sounds")
 REPORTS_DIR = os.path.join(BASE_DIR, "Reports")
+FACE_SIZE = (100, 100)  # Face crops are normalized to this size for the recognizer
+DETECT_SCALE = 0.5  # Frames are downscaled by this factor before face detection
+STATUS_REDRAW_INTERVAL = 0.2  # Minimum seconds between forced status bar redraws
+FRAME_DIFF_THRESHOLD = 512  # 16x16 thumbnail sum change below which a frame counts as unchanged
+DETECT_REFRESH_INTERVAL = 0.2  # Seconds before detection reruns even on an unchanged frame
+ATTENDANCE_PAGE_SIZE = 500  # Records loaded into the attendance display per page
+EMBEDDING_MATCH_THRESHOLD = 0.35  # Minimum cosine similarity for an embedding match
+EMBEDDING_UNKNOWN_THRESHOLD = 0.2  # Cosine similarity below which a face is saved as unknown
+EMBEDDING_BATCH_SIZE = 64  # Training crops pushed through the embedder per forward pass
+ATTENDANCE_FLUSH_FRAMES = 30  # Frames between writes of buffered attendance to the database
+CAPTURE_SOUND_INTERVAL = 1.0  # Minimum seconds between capture sounds while registering
+CAPTURE_SAMPLE_INTERVAL = 0.1  # Minimum seconds between saved samples, so they span distinct poses
 
 # Create directories if they don't exist
 os.makedirs(TRAINING_IMAGE_DIR, exist_ok=True)
@@ -33,93 +56,184 @@ os.makedirs(SOUNDS_DIR, exist_ok=True)
 os.makedirs(REPORTS_DIR, exist_ok=True)
 os.makedirs(os.path.dirname(STUDENT_DB_PATH), exist_ok=True)
 
+# SQL statements used on the attendance marking path
+SQL_MARK_ATTENDANCE = '''
+    INSERT OR IGNORE INTO attendance (id, name, date, time)
+    VALUES (?, ?, ?, ?)
+'''
+SQL_UPDATE_LAST_ATTENDANCE = '''
+    UPDATE students
+    SET last_attendance = ?
+    WHERE id = ?
+'''
+SQL_GET_STUDENT_NAME = 'SELECT name FROM students WHERE id = ?'
+
+password_hasher = PasswordHasher()  # Admin passwords are stored as argon2 hashes
+
+@functools.lru_cache(maxsize=16)
+def _sound_file(name):
+    """Return the path of a sound effect, or None if it doesn't exist"""
+    path = os.path.join(SOUNDS_DIR, name)
+    return path if os.path.exists(path) else None
+
 class ThreadSafeDatabase:
+    # Methods that modify the database run under the writer lock in a transaction
+    WRITE_METHODS = {'add_student', 'mark_attendance_batch', 'change_admin_password'}
+    READ_METHODS = {'get_student_name', 'get_attendance_records',
+                    'get_all_students', 'get_stats', 'verify_admin'}
+
     def __init__(self):
-        self.db_queue = queue.Queue()
-        self.result_queue = queue.Queue()
-        self.worker_thread = threading.Thread(target=self._db_worker, daemon=True)
-        self.worker_thread.start()
-    
-    def _db_worker(self):
-        """Worker thread that handles all database operations"""
-        conn = sqlite3.connect(STUDENT_DB_PATH)
-        conn.execute("PRAGMA journal_mode=WAL")  # Enable WAL mode for better concurrency
-        cursor = conn.cursor()
-        
-        # Create tables if they don't exist
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS students (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                registration_date TEXT,
-                last_attendance TEXT
-            )
-        ''')
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS attendance (
-                id TEXT,
-                name TEXT,
-                date TEXT,
-                time TEXT,
-                FOREIGN KEY(id) REFERENCES students(id)
-            )
-        ''')
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS admin (
-                username TEXT PRIMARY KEY,
-                password TEXT NOT NULL
-            )
-        ''')
-        
-        # Insert default admin account if none exists
-        cursor.execute('SELECT 1 FROM admin')
-        if not cursor.fetchone():
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._connections = []
+        self._idle_connections = []  # Released by finished worker threads
+        self._connections_lock = threading.Lock()
+        self._create_schema()
+    
+    def _get_conn(self):
+        """Return the calling thread's connection, taking an idle one or opening one on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+        with self._connections_lock:
+            conn = self._idle_connections.pop() if self._idle_connections else None
+        if conn is None:
+            conn = sqlite3.connect(STUDENT_DB_PATH, check_same_thread=False,
+                                   isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")  # Enable WAL mode for better concurrency
+            conn.execute("PRAGMA synchronous=NORMAL")  # Safe under WAL, avoids fsync per commit
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA mmap_size=268435456")
+            conn.execute("PRAGMA busy_timeout=30000")
+            with self._connections_lock:
+                self._connections.append(conn)
+        self._local.conn = conn
+        return conn
+    
+    def release_connection(self):
+        """Return the calling thread's connection to the pool for other threads"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._local.conn = None
+            with self._connections_lock:
+                self._idle_connections.append(conn)
+    
+    def _create_schema(self):
+        """Create tables, indexes and the default admin account"""
+        with self._write_lock:
+            cursor = self._get_conn().cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            
+            # Create tables if they don't exist
             cursor.execute('''
-                INSERT INTO admin (username, password)
-                VALUES (?, ?)
-            ''', ('admin', 'admin123'))  # Default credentials
-        
-        conn.commit()
-        
-        while True:
-            task = self.db_queue.get()
-            if task == 'STOP':
-                conn.close()
-                break
-                
-            method, args, kwargs = task
-            try:
-                if method == 'add_student':
-                    result = self._add_student(cursor, *args, **kwargs)
-                elif method == 'mark_attendance':
-                    result = self._mark_attendance(cursor, *args, **kwargs)
-                elif method == 'get_student_name':
-                    result = self._get_student_name(cursor, *args, **kwargs)
-                elif method == 'get_attendance_records':
-                    result = self._get_attendance_records(cursor, *args, **kwargs)
-                elif method == 'get_all_students':
-                    result = self._get_all_students(cursor, *args, **kwargs)
-                elif method == 'verify_admin':
-                    result = self._verify_admin(cursor, *args, **kwargs)
-                elif method == 'change_admin_password':
-                    result = self._change_admin_password(cursor, *args, **kwargs)
-                else:
-                    result = ValueError(f"Unknown method: {method}")
-                
-                conn.commit()
-                self.result_queue.put(result)
-            except Exception as e:
-                self.result_queue.put(e)
-            finally:
-                self.db_queue.task_done()
+                CREATE TABLE IF NOT EXISTS students (
+                    id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    registration_date TEXT,
+                    last_attendance TEXT
+                )
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS attendance (
+                    id TEXT,
+                    name TEXT,
+                    date TEXT,
+                    time TEXT,
+                    FOREIGN KEY(id) REFERENCES students(id)
+                )
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS admin (
+                    username TEXT PRIMARY KEY,
+                    password_hash TEXT NOT NULL
+                )
+            ''')
+
+            # Rebuild admin tables from older databases that still have a
+            # password column, hashing plaintext and keeping existing hashes
+            cursor.execute('PRAGMA table_info(admin)')
+            columns = {row[1] for row in cursor.fetchall()}
+            if 'password' in columns:
+                hash_column = 'password_hash' if 'password_hash' in columns else 'NULL'
+                cursor.execute(f'SELECT username, password, {hash_column} FROM admin')
+                accounts = []
+                for username, password, password_hash in cursor.fetchall():
+                    if password_hash:
+                        accounts.append((username, password_hash))
+                    elif isinstance(password, str) and password.startswith('$argon2'):
+                        accounts.append((username, password))
+                    elif isinstance(password, str) and password:
+                        accounts.append((username, password_hasher.hash(password)))
+                    # Anything else (empty, or a hash argon2 can't read) is dropped
+                cursor.execute('DROP TABLE admin')
+                cursor.execute('''
+                    CREATE TABLE admin (
+                        username TEXT PRIMARY KEY,
+                        password_hash TEXT NOT NULL
+                    )
+                ''')
+                cursor.executemany('''
+                    INSERT INTO admin (username, password_hash)
+                    VALUES (?, ?)
+                ''', accounts)
+
+            # Databases from before the unique index may hold repeat marks for a
+            # day; keep the first of each so the index can be built
+            has_unique = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='index' AND name='idx_attendance_id_date'"
+            ).fetchone()
+            if not has_unique:
+                cursor.execute('''
+                    DELETE FROM attendance WHERE rowid NOT IN (
+                        SELECT MIN(rowid) FROM attendance GROUP BY id, date
+                    )
+                ''')
+
+            # Indexes for the per-face duplicate check and name-ordered listings
+            cursor.execute('''
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_attendance_id_date
+                ON attendance (id, date)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_students_name
+                ON students (name)
+            ''')
+            # Covers the date-filtered, time-ordered attendance listings
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_attendance_date_time
+                ON attendance (date, time, id, name)
+            ''')
+
+            # Insert default admin account if none exists
+            cursor.execute('SELECT 1 FROM admin')
+            if not cursor.fetchone():
+                cursor.execute('''
+                    INSERT INTO admin (username, password_hash)
+                    VALUES (?, ?)
+                ''', ('admin', password_hasher.hash('admin123')))  # Default credentials
+            
+            cursor.execute('COMMIT')
     
     def execute(self, method, *args, **kwargs):
-        """Execute a database method in the worker thread"""
-        self.db_queue.put((method, args, kwargs))
-        result = self.result_queue.get()
-        if isinstance(result, Exception):
-            raise result
-        return result
+        """Execute a database method on the calling thread's connection"""
+        if method not in self.WRITE_METHODS and method not in self.READ_METHODS:
+            raise ValueError(f"Unknown method: {method}")
+        handler = getattr(self, f"_{method}")
+        cursor = self._get_conn().cursor()
+        
+        if method in self.READ_METHODS:
+            # WAL lets readers proceed alongside the single writer
+            return handler(cursor, *args, **kwargs)
+        
+        with self._write_lock:
+            cursor.execute('BEGIN IMMEDIATE')
+            try:
+                result = handler(cursor, *args, **kwargs)
+            except Exception:
+                cursor.execute('ROLLBACK')
+                raise
+            cursor.execute('COMMIT')
+            return result
     
     def _add_student(self, cursor, student_id, name):
         """Add a new student to the database"""
@@ -130,51 +244,56 @@ class ThreadSafeDatabase:
         ''', (student_id, name, registration_date))
         return cursor.rowcount > 0
     
-    def _mark_attendance(self, cursor, student_id, name):
-        """Mark attendance for a student"""
-        date = datetime.datetime.now().strftime('%Y-%m-%d')
-        time_str = datetime.datetime.now().strftime('%H:%M:%S')
-        
-        # Check if already marked today
-        cursor.execute('''
-            SELECT 1 FROM attendance 
-            WHERE id = ? AND date = ?
-        ''', (student_id, date))
-        if cursor.fetchone() is None:
-            cursor.execute('''
-                INSERT INTO attendance (id, name, date, time)
-                VALUES (?, ?, ?, ?)
-            ''', (student_id, name, date, time_str))
-            
-            # Update last attendance in students table
-            cursor.execute('''
-                UPDATE students 
-                SET last_attendance = ?
-                WHERE id = ?
-            ''', (f"{date} {time_str}", student_id))
-            
-            return True
-        return False
-    
+    def _mark_attendance_batch(self, cursor, students):
+        """Mark attendance for several (student_id, name) pairs at once
+
+        Returns the IDs that were newly marked for today.
+        """
+        now = datetime.datetime.now().isoformat(sep=' ', timespec='seconds')
+        date, time_str = now[:10], now[11:]
+        students = dict(students)
+
+        # Skip students who already have a record today
+        placeholders = ', '.join('?' * len(students))
+        cursor.execute(f'''
+            SELECT id FROM attendance
+            WHERE date = ? AND id IN ({placeholders})
+        ''', (date, *students))
+        already_marked = {row[0] for row in cursor.fetchall()}
+        new_ids = [student_id for student_id in students if student_id not in already_marked]
+
+        cursor.executemany(SQL_MARK_ATTENDANCE, [
+            (student_id, students[student_id], date, time_str) for student_id in new_ids
+        ])
+        cursor.executemany(SQL_UPDATE_LAST_ATTENDANCE, [
+            (now, student_id) for student_id in new_ids
+        ])
+        return new_ids
+
     def _get_student_name(self, cursor, student_id):
         """Get student name by ID"""
-        cursor.execute('SELECT name FROM students WHERE id = ?', (student_id,))
+        cursor.execute(SQL_GET_STUDENT_NAME, (student_id,))
         result = cursor.fetchone()
         return result[0] if result else None
     
-    def _get_attendance_records(self, cursor, date=None):
-        """Get attendance records for a specific date or all dates"""
+    def _get_attendance_records(self, cursor, date=None, limit=-1, offset=0):
+        """Get attendance records for a specific date or all dates
+
+        A negative limit returns every record from offset onwards.
+        """
         if date:
             cursor.execute('''
                 SELECT id, name, date, time FROM attendance 
                 WHERE date = ?
                 ORDER BY time DESC
-            ''', (date,))
+                LIMIT ? OFFSET ?
+            ''', (date, limit, offset))
         else:
             cursor.execute('''
                 SELECT id, name, date, time FROM attendance 
                 ORDER BY date DESC, time DESC
-            ''')
+                LIMIT ? OFFSET ?
+            ''', (limit, offset))
         return cursor.fetchall()
     
     def _get_all_students(self, cursor):
@@ -182,29 +301,187 @@ class ThreadSafeDatabase:
         cursor.execute('SELECT id, name FROM students ORDER BY name')
         return cursor.fetchall()
     
-    def _verify_admin(self, cursor, username, password):
-        """Verify admin credentials"""
+    def _get_stats(self, cursor, date):
+        """Get (student count, attendance count for date, total attendance count)"""
         cursor.execute('''
-            SELECT 1 FROM admin 
-            WHERE username = ? AND password = ?
-        ''', (username, password))
-        return cursor.fetchone() is not None
+            SELECT (SELECT COUNT(*) FROM students),
+                   (SELECT COUNT(*) FROM attendance WHERE date = ?),
+                   (SELECT COUNT(*) FROM attendance)
+        ''', (date,))
+        return cursor.fetchone()
     
-    def _change_admin_password(self, cursor, username, new_password):
-        """Change admin password"""
+    def _verify_admin(self, cursor, username, password):
+        """Verify admin credentials against the stored argon2 hash"""
+        cursor.execute('SELECT password_hash FROM admin WHERE username = ?', (username,))
+        row = cursor.fetchone()
+        if row is None:
+            return False
+        try:
+            return password_hasher.verify(row[0], password)
+        except (VerificationError, InvalidHashError):
+            return False
+
+    def _change_admin_password(self, cursor, username, password_hash):
+        """Change admin password, given its argon2 hash"""
         cursor.execute('''
-            UPDATE admin 
-            SET password = ?
+            UPDATE admin
+            SET password_hash = ?
             WHERE username = ?
-        ''', (new_password, username))
+        ''', (password_hash, username))
         return cursor.rowcount > 0
     
     def close(self):
-        """Cleanly shutdown the database worker"""
-        self.db_queue.put('STOP')
-        self.worker_thread.join()
+        """Close every connection opened by this database"""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+            self._idle_connections.clear()
+
+class FaceDetector:
+    """Face detector using YuNet when its model is present, else the Haar cascade,
+    running on the GPU when OpenCV has CUDA"""
+    YUNET_SCORE_THRESHOLD = 0.7
+    
+    def __init__(self, scale_factor, min_neighbors):
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self._gpu_gray = None
+        self._yunet = None
+        self._yunet_size = None
+        self._use_umat = False
+        
+        if os.path.exists(YUNET_MODEL_PATH):
+            # Single-shot CNN detector; the input size is set from the first frame
+            if self._cuda_available():
+                backend, target = cv2.dnn.DNN_BACKEND_CUDA, cv2.dnn.DNN_TARGET_CUDA_FP16
+            else:
+                backend, target = cv2.dnn.DNN_BACKEND_DEFAULT, cv2.dnn.DNN_TARGET_CPU
+            self._yunet = cv2.FaceDetectorYN.create(
+                YUNET_MODEL_PATH, "", (320, 320), self.YUNET_SCORE_THRESHOLD,
+                backend_id=backend, target_id=target
+            )
+        else:
+            self._cascade = self._load_cuda_cascade() if self._cuda_available() else None
+            if self._cascade is not None:
+                self._cascade.setScaleFactor(scale_factor)
+                self._cascade.setMinNeighbors(min_neighbors)
+                # Persistent device buffer so frames don't reallocate on upload
+                self._gpu_gray = cv2.cuda_GpuMat()
+            else:
+                self._cascade = cv2.CascadeClassifier(HAARCASCADE_PATH)
+                if self._cascade.empty():
+                    raise RuntimeError("Could not load face detection model")
+                # Without CUDA, let the transparent API run resize + detect through OpenCL
+                if cv2.ocl.haveOpenCL():
+                    cv2.ocl.setUseOpenCL(True)
+                    self._use_umat = True
+    
+    @staticmethod
+    def _cuda_available():
+        """Check whether this OpenCV build can see a CUDA device"""
+        try:
+            return cv2.cuda.getCudaEnabledDeviceCount() > 0
+        except (AttributeError, cv2.error):
+            return False
+    
+    @staticmethod
+    def _load_cuda_cascade():
+        """Load the Haar cascade for the GPU, or return None if CUDA can't read it"""
+        # cuda::CascadeClassifier only reads old-format HAAR, NVBIN or LBP
+        # cascades, and the bundled XML is the newer traincascade format
+        try:
+            return cv2.cuda.CascadeClassifier.create(HAARCASCADE_PATH)
+        except cv2.error:
+            return None
+    
+    def detect(self, frame, gray):
+        """Return full-resolution (x, y, w, h) face rectangles for a BGR frame and its grayscale copy"""
+        # Detect on a downscaled copy and map the boxes back to full resolution
+        image = frame if self._yunet is not None else gray
+        if self._use_umat:
+            # Upload only the grayscale frame; it stays on the device until detection
+            image = cv2.UMat(image)
+        small = cv2.resize(image, None, fx=DETECT_SCALE, fy=DETECT_SCALE,
+                           interpolation=cv2.INTER_AREA)
+        faces = self._detect(small)
+        if len(faces) == 0:
+            return []
+        return (np.asarray(faces) / DETECT_SCALE).astype(int)
+    
+    def _detect(self, image):
+        """Return (x, y, w, h) face rectangles in a BGR image for YuNet, else grayscale"""
+        if self._yunet is not None:
+            size = (image.shape[1], image.shape[0])
+            if size != self._yunet_size:
+                self._yunet.setInputSize(size)
+                self._yunet_size = size
+            _, faces = self._yunet.detect(image)
+            if faces is None:
+                return []
+            # Boxes can start slightly outside the frame, which would break slicing
+            return np.maximum(faces[:, :4], 0)
+        if self._gpu_gray is not None:
+            self._gpu_gray.upload(image)
+            objbuf = self._cascade.detectMultiScale(self._gpu_gray)
+            return self._cascade.convert(objbuf)
+        return self._cascade.detectMultiScale(image, self.scale_factor, self.min_neighbors)
+
+class FaceEmbedder:
+    """SFace DNN embedder matching faces by cosine similarity against the enrolled gallery"""
+    INPUT_SIZE = (112, 112)
+    _gallery = None  # (embeddings, ids) shared across recognition sessions
+    
+    def __init__(self):
+        self.net = cv2.dnn.readNet(EMBEDDER_MODEL_PATH)
+    
+    @staticmethod
+    def available():
+        """Check whether the embedder model has been downloaded"""
+        return os.path.exists(EMBEDDER_MODEL_PATH)
+    
+    def embed(self, crops):
+        """Return L2-normalized embeddings for a list of face crops in one forward pass"""
+        crops = [cv2.cvtColor(c, cv2.COLOR_GRAY2BGR) if c.ndim == 2 else c for c in crops]
+        # SFace takes raw 0-255 RGB pixels, so no scaling
+        blob = cv2.dnn.blobFromImages(crops, 1.0, self.INPUT_SIZE, swapRB=True)
+        self.net.setInput(blob)
+        emb = self.net.forward().reshape(len(crops), -1).astype(np.float32)
+        emb /= np.maximum(np.linalg.norm(emb, axis=1, keepdims=True), 1e-12)
+        return emb
+    
+    @classmethod
+    def save_gallery(cls, embeddings, ids):
+        """Persist enrolled embeddings and replace the cached gallery"""
+        np.save(EMBEDDINGS_PATH, embeddings)
+        np.save(EMBEDDING_IDS_PATH, ids)
+        cls._gallery = (embeddings, ids)
+    
+    @classmethod
+    def load_gallery(cls):
+        """Return the enrolled (embeddings, ids), reading them from disk once"""
+        if cls._gallery is None:
+            cls._gallery = (np.load(EMBEDDINGS_PATH), np.load(EMBEDDING_IDS_PATH))
+        return cls._gallery
+    
+    @classmethod
+    def clear_gallery(cls):
+        """Drop the cached gallery so the next session reloads it"""
+        cls._gallery = None
+    
+    def match(self, crops):
+        """Return (id, similarity) for each face crop against the gallery"""
+        gallery, ids = self.load_gallery()
+        scores = self.embed(crops) @ gallery.T
+        best = scores.argmax(axis=1)
+        return zip(ids[best].tolist(), scores[np.arange(len(best)), best].tolist())
 
 class SpiderWebBackground(tk.Canvas):
+    _spider_photo = None  # Shared spider sprite, created on first use
+    FRAME_TIME = 1 / 30  # Target animation frame time; velocities are pixels per frame
+    MAX_FRAME_STEP = 3  # Drop missed frames beyond this instead of catching up
+    SOUND_REPEAT_INTERVAL = 0.3  # Seconds before the same sound may play again
+    
     def __init__(self, master, **kwargs):
         super().__init__(master, **kwargs)
         self.configure(bg='#0a0a0a', highlightthickness=0)
@@ -216,26 +493,44 @@ class SpiderWebBackground(tk.Canvas):
         self.spider_position = [50, 750]
         self.spider_direction = [1, -1]  # x, y direction
         self.animate_spider = False
-        self.particles = []
+        # Particle state as parallel arrays: canvas ids, positions, velocities
+        self._pids = np.empty(0, dtype=np.int64)
+        self._pxy = np.empty((0, 2), dtype=np.float32)
+        self._pdxy = np.empty((0, 2), dtype=np.float32)
+        self._last_sound = {}  # Sound name -> monotonic time it last played
         self.draw_web()
         self.create_spider()
         self.create_particles(30)
         
+        # Skip animation work while the window is minimized or hidden
+        self._anim_enabled = True
+        self._last_frame = time.monotonic()
+        master.bind("<Unmap>", self._on_unmap, add="+")
+        master.bind("<Map>", self._on_map, add="+")
+        
+    def _on_unmap(self, event):
+        """Stop animating when the main window is unmapped"""
+        if event.widget is self.master:
+            self._anim_enabled = False
+    
+    def _on_map(self, event):
+        """Resume animating when the main window is mapped again"""
+        if event.widget is self.master:
+            self._anim_enabled = True
+        
     def draw_web(self):
         """Draw the spider web pattern"""
-        # Clear existing web
-        for line in self.web_lines:
-            self.delete(line)
-        for circle in self.web_circles:
-            self.delete(circle)
+        # Clear existing web (all strands and spirals share the "web" tag)
+        self.delete("web")
             
         self.web_lines = []
         self.web_circles = []
         
         # Draw radial lines (spider web strands)
-        for angle in range(0, 360, 30):
-            end_x = self.web_center_x + 900 * np.cos(np.radians(angle))
-            end_y = self.web_center_y + 900 * np.sin(np.radians(angle))
+        angles = np.deg2rad(np.arange(0, 360, 30))
+        ends_x = self.web_center_x + 900 * np.cos(angles)
+        ends_y = self.web_center_y + 900 * np.sin(angles)
+        for end_x, end_y in zip(ends_x, ends_y):
             line = self.create_line(
                 self.web_center_x, self.web_center_y, end_x, end_y, 
                 fill='#8b0000', width=2, dash=(3, 3), tags="web"
@@ -253,14 +548,21 @@ class SpiderWebBackground(tk.Canvas):
     
     def create_spider(self):
         """Create a simple spider graphic"""
+        # The sprite is static, so build the PhotoImage once and share it
+        if SpiderWebBackground._spider_photo is None:
+            SpiderWebBackground._spider_photo = ImageTk.PhotoImage(self._load_spider_image())
+        self.spider_img = SpiderWebBackground._spider_photo
+        self.spider = self.create_image(
+            self.spider_position[0], self.spider_position[1], 
+            image=self.spider_img, anchor="nw", tags="spider"
+        )
+    
+    @staticmethod
+    def _load_spider_image():
+        """Load the spider sprite, drawing a simple one if no image is available"""
         try:
             # Try to load spider image if available
-            spider_img = Image.open("spider.png").resize((100, 100))
-            self.spider_img = ImageTk.PhotoImage(spider_img)
-            self.spider = self.create_image(
-                self.spider_position[0], self.spider_position[1], 
-                image=self.spider_img, anchor="nw", tags="spider"
-            )
+            return Image.open("spider.png").resize((100, 100))
         except:
             # Fallback to drawing a simple spider
             spider_img = Image.new('RGBA', (100, 100), (0, 0, 0, 0))
@@ -270,21 +572,18 @@ class SpiderWebBackground(tk.Canvas):
             # Head
             draw.ellipse((45, 30, 55, 40), fill='black')
             # Legs
-            for angle in range(0, 360, 45):
-                start_x = 50 + 10 * np.cos(np.radians(angle))
-                start_y = 50 + 10 * np.sin(np.radians(angle))
-                end_x = 50 + 30 * np.cos(np.radians(angle))
-                end_y = 50 + 30 * np.sin(np.radians(angle))
+            angles = np.deg2rad(np.arange(0, 360, 45))
+            cos_a, sin_a = np.cos(angles), np.sin(angles)
+            for start_x, start_y, end_x, end_y in zip(
+                50 + 10 * cos_a, 50 + 10 * sin_a, 50 + 30 * cos_a, 50 + 30 * sin_a
+            ):
                 draw.line((start_x, start_y, end_x, end_y), fill='black', width=3)
-            
-            self.spider_img = ImageTk.PhotoImage(spider_img)
-            self.spider = self.create_image(
-                self.spider_position[0], self.spider_position[1], 
-                image=self.spider_img, anchor="nw", tags="spider"
-            )
+            return spider_img
     
     def create_particles(self, count):
         """Create floating particles for background effect"""
+        ids = []
+        positions = []
         for _ in range(count):
             x = random.randint(0, self.winfo_reqwidth())
             y = random.randint(0, self.winfo_reqheight())
@@ -293,57 +592,72 @@ class SpiderWebBackground(tk.Canvas):
                 x, y, x+size, y+size, 
                 fill='#8b0000', outline='', tags="particle"
             )
-            self.particles.append({
-                'id': particle,
-                'x': x,
-                'y': y,
-                'dx': random.uniform(-0.5, 0.5),
-                'dy': random.uniform(-0.5, 0.5)
-            })
+            ids.append(particle)
+            positions.append((x, y))
+        
+        velocities = np.random.uniform(-0.5, 0.5, (count, 2)).astype(np.float32)
+        self._pids = np.concatenate((self._pids, np.array(ids, dtype=np.int64)))
+        self._pxy = np.concatenate((self._pxy, np.array(positions, dtype=np.float32)))
+        self._pdxy = np.concatenate((self._pdxy, velocities))
     
     def animate(self):
         """Animate the spider and particles"""
+        now = time.monotonic()
+        if not self._anim_enabled:
+            self._last_frame = now
+            self.after(200, self.animate)
+            return
+        
+        elapsed = now - self._last_frame
+        if elapsed < self.FRAME_TIME:
+            self.after(int((self.FRAME_TIME - elapsed) * 1000) + 1, self.animate)
+            return
+        self._last_frame = now
+        
+        # Scale motion by elapsed time so speed doesn't depend on timer jitter
+        step = min(elapsed / self.FRAME_TIME, self.MAX_FRAME_STEP)
+        
         if self.animate_spider:
             # Move spider
-            self.spider_position[0] += self.spider_direction[0]
-            self.spider_position[1] += self.spider_direction[1]
+            self.move(self.spider, self.spider_direction[0] * step,
+                      self.spider_direction[1] * step)
+            spider_x, spider_y = self.coords(self.spider)
             
-            # Bounce off edges
-            if self.spider_position[0] <= 0 or self.spider_position[0] >= self.winfo_reqwidth() - 100:
+            # Bounce off edges, only while still heading outward: a long step
+            # can overshoot, and flipping again next frame would trap the spider
+            dir_x, dir_y = self.spider_direction
+            if (spider_x <= 0 and dir_x < 0) or (spider_x >= self.winfo_reqwidth() - 100 and dir_x > 0):
                 self.spider_direction[0] *= -1
                 self.play_sound("bounce.wav")
-            if self.spider_position[1] <= 0 or self.spider_position[1] >= self.winfo_reqheight() - 100:
+            if (spider_y <= 0 and dir_y < 0) or (spider_y >= self.winfo_reqheight() - 100 and dir_y > 0):
                 self.spider_direction[1] *= -1
                 self.play_sound("bounce.wav")
-            
-            self.coords(self.spider, self.spider_position[0], self.spider_position[1])
         
-        # Move particles
-        for particle in self.particles:
-            particle['x'] += particle['dx']
-            particle['y'] += particle['dy']
-            
-            # Wrap around screen edges
-            if particle['x'] < 0:
-                particle['x'] = self.winfo_reqwidth()
-            elif particle['x'] > self.winfo_reqwidth():
-                particle['x'] = 0
-            if particle['y'] < 0:
-                particle['y'] = self.winfo_reqheight()
-            elif particle['y'] > self.winfo_reqheight():
-                particle['y'] = 0
-                
-            self.coords(particle['id'], particle['x'], particle['y'], 
-                       particle['x']+3, particle['y']+3)
+        # Move particles, wrapping around screen edges
+        previous = self._pxy.copy()
+        self._pxy += self._pdxy * step
+        np.mod(self._pxy, (self.winfo_reqwidth(), self.winfo_reqheight()), out=self._pxy)
+        deltas = self._pxy - previous
+        for pid, (dx, dy) in zip(self._pids.tolist(), deltas.tolist()):
+            self.move(pid, dx, dy)
         
-        self.after(30, self.animate)
+        self.after(int(self.FRAME_TIME * 1000), self.animate)
     
     def play_sound(self, sound_file):
-        """Play a sound effect if available"""
-        sound_path = os.path.join(SOUNDS_DIR, sound_file)
-        if os.path.exists(sound_path):
+        """Play a sound effect if available, skipping rapid repeats of the same one"""
+        now = time.monotonic()
+        if now - self._last_sound.get(sound_file, 0) < self.SOUND_REPEAT_INTERVAL:
+            return
+        self._last_sound[sound_file] = now
+        
+        sound_path = _sound_file(sound_file)
+        if sound_path:
             try:
-                winsound.PlaySound(sound_path, winsound.SND_ASYNC)
+                winsound.PlaySound(
+                    sound_path,
+                    winsound.SND_ASYNC | winsound.SND_NODEFAULT
+                    | winsound.SND_FILENAME | winsound.SND_NOWAIT
+                )
             except:
                 pass
 
@@ -356,12 +670,24 @@ class AttendanceSystem:
         
         # Initialize thread-safe database
         self.db = ThreadSafeDatabase()
-        self.db_lock = threading.Lock()
+        
+        # Student ID -> name, so recognition doesn't query per face
+        self._name_cache = dict(self.db.execute('get_all_students'))
+        
+        # (student_id, name) recognized but not yet written to the database
+        self._pending_attendance = []
+        
+        # Statistics counts, recomputed only after a write marks them dirty
+        self._stats_cache = {}
+        self._stats_dirty = True
         
         # Admin state
         self.admin_logged_in = False
         self.admin_username = "admin"  # Default admin username
         
+        # Sound effects
+        self.load_sounds()
+        
         # Create spider web background
         self.canvas = SpiderWebBackground(self.window, width=1600, height=800)
         self.canvas.pack(fill="both", expand=True)
@@ -370,34 +696,33 @@ class AttendanceSystem:
         self.canvas.animate_spider = True
         self.canvas.animate()
         
+        # Last time update_status forced a redraw
+        self._last_status_redraw = 0
+        
         # Setup UI
         self.setup_ui()
         
-        # Sound effects
-        self.load_sounds()
-        
         # Current state
         self.camera_active = False
         self.capture_thread = None
         self.recognition_thread = None
+        self.preview_window = None
+        
+        # Frame buffers reused across camera loops instead of reallocated per frame
+        self._gray_buf = None
+        self._roi_pool = [np.empty(FACE_SIZE, dtype=np.uint8) for _ in range(4)]
+        
+        # Models loaded on first use and kept across camera sessions
+        self._detectors = {}
+        self._recognizer = None
+        self._embedder = None
         
     def load_sounds(self):
-        """Ensure sound files exist or create placeholders"""
-        sounds = {
-            "success.wav": 440,  # Frequency for simple tones
-            "error.wav": 220,
-            "capture.wav": 880,
-            "bounce.wav": 660
-        }
+        """Look up sound files once so playback needs no filesystem checks"""
+        sounds = ["success.wav", "error.wav", "capture.wav", "bounce.wav"]
         
-        for sound_file, frequency in sounds.items():
-            sound_path = os.path.join(SOUNDS_DIR, sound_file)
-            if not os.path.exists(sound_path):
-                try:
-                    duration = 300  # milliseconds
-                    winsound.Beep(frequency, duration)
-                except:
-                    pass
+        for sound_file in sounds:
+            _sound_file(sound_file)
     
     def setup_ui(self):
         """Create all UI elements"""
@@ -555,15 +880,19 @@ class AttendanceSystem:
         self.attendance_tree.column('date', width=100, anchor='center')
         self.attendance_tree.column('time', width=100, anchor='center')
         
-        # Add scrollbar
-        scrollbar = ttk.Scrollbar(
+        # Add scrollbar; scrolling near the bottom loads the next page of records
+        self.attendance_scrollbar = ttk.Scrollbar(
             attendance_frame, orient='vertical', 
             command=self.attendance_tree.yview
         )
-        self.attendance_tree.configure(yscrollcommand=scrollbar.set)
+        self._attendance_generation = 0
+        self._attendance_offset = 0
+        self._attendance_has_more = False
+        self._attendance_loading = False
+        self.attendance_tree.configure(yscrollcommand=self._on_attendance_scroll)
         
         self.attendance_tree.pack(side='left', fill='both', expand=True)
-        scrollbar.pack(side='right', fill='y')
+        self.attendance_scrollbar.pack(side='right', fill='y')
         
         # Load initial attendance data
         self.refresh_attendance()
@@ -698,21 +1027,39 @@ class AttendanceSystem:
         username = self.admin_user_var.get()
         password = self.admin_pass_var.get()
         
+        # Verify in a separate thread so the UI stays responsive
+        self.login_btn.config(state='disabled')
+        threading.Thread(
+            target=self._admin_login_thread,
+            args=(username, password),
+            daemon=True
+        ).start()
+    
+    def _admin_login_thread(self, username, password):
+        """Thread function for verifying admin credentials"""
         try:
-            with self.db_lock:
-                valid = self.db.execute('verify_admin', username, password)
-            
-            if valid:
-                self.admin_logged_in = True
-                self.admin_username = username
-                self.update_admin_ui()
-                messagebox.showinfo("Success", "Admin privileges activated!")
-                self.canvas.play_sound("success.wav")
-            else:
-                messagebox.showerror("Error", "Invalid username or password!")
-                self.canvas.play_sound("error.wav")
+            valid = self.db.execute('verify_admin', username, password)
+            self.window.after(0, self._finish_admin_login, username, valid, None)
         except Exception as e:
-            messagebox.showerror("Error", f"Login failed: {str(e)}")
+            self.window.after(0, self._finish_admin_login, username, False, e)
+        finally:
+            self.db.release_connection()
+    
+    def _finish_admin_login(self, username, valid, error):
+        """Apply the result of a login attempt on the UI thread"""
+        if error is not None:
+            self.login_btn.config(state='normal')
+            messagebox.showerror("Error", f"Login failed: {str(error)}")
+            self.canvas.play_sound("error.wav")
+        elif valid:
+            self.admin_logged_in = True
+            self.admin_username = username
+            self.update_admin_ui()
+            messagebox.showinfo("Success", "Admin privileges activated!")
+            self.canvas.play_sound("success.wav")
+        else:
+            self.login_btn.config(state='normal')
+            messagebox.showerror("Error", "Invalid username or password!")
             self.canvas.play_sound("error.wav")
     
     def admin_logout(self):
@@ -733,20 +1080,36 @@ class AttendanceSystem:
             messagebox.showwarning("Error", "Please enter a new password!")
             return
             
+        # Update in a separate thread so the UI stays responsive
+        threading.Thread(
+            target=self._change_admin_password_thread,
+            args=(self.admin_username, new_password),
+            daemon=True
+        ).start()
+    
+    def _change_admin_password_thread(self, username, new_password):
+        """Thread function for changing the admin password"""
         try:
-            with self.db_lock:
-                success = self.db.execute('change_admin_password', 
-                                        self.admin_username, new_password)
-            
-            if success:
-                messagebox.showinfo("Success", "Password changed successfully!")
-                self.canvas.play_sound("success.wav")
-                self.new_pass_var.set("")  # Clear password field
-            else:
-                messagebox.showerror("Error", "Failed to change password!")
-                self.canvas.play_sound("error.wav")
+            password_hash = password_hasher.hash(new_password)
+            success = self.db.execute('change_admin_password', 
+                                    username, password_hash)
+            self.window.after(0, self._finish_change_admin_password, success, None)
         except Exception as e:
-            messagebox.showerror("Error", f"Password change failed: {str(e)}")
+            self.window.after(0, self._finish_change_admin_password, False, e)
+        finally:
+            self.db.release_connection()
+    
+    def _finish_change_admin_password(self, success, error):
+        """Apply the result of a password change on the UI thread"""
+        if error is not None:
+            messagebox.showerror("Error", f"Password change failed: {str(error)}")
+            self.canvas.play_sound("error.wav")
+        elif success:
+            messagebox.showinfo("Success", "Password changed successfully!")
+            self.canvas.play_sound("success.wav")
+            self.new_pass_var.set("")  # Clear password field
+        else:
+            messagebox.showerror("Error", "Failed to change password!")
             self.canvas.play_sound("error.wav")
     
     def update_admin_ui(self):
@@ -772,8 +1135,7 @@ class AttendanceSystem:
             return
         
         try:
-            with self.db_lock:
-                students = self.db.execute('get_all_students')
+            students = self.db.execute('get_all_students')
             
             if not students:
                 messagebox.showinfo("Students", "No students registered yet!")
@@ -817,28 +1179,18 @@ class AttendanceSystem:
             "WARNING: This will delete all training images and attendance records.\nContinue?"
         ):
             try:
-                # Delete training images
-                for filename in os.listdir(TRAINING_IMAGE_DIR):
-                    file_path = os.path.join(TRAINING_IMAGE_DIR, filename)
-                    try:
-                        if os.path.isfile(file_path):
-                            os.unlink(file_path)
-                    except Exception as e:
-                        print(f"Failed to delete {file_path}: {e}")
-                
-                # Delete attendance files
-                for filename in os.listdir(ATTENDANCE_DIR):
-                    file_path = os.path.join(ATTENDANCE_DIR, filename)
-                    try:
-                        if os.path.isfile(file_path):
-                            os.unlink(file_path)
-                    except Exception as e:
-                        print(f"Failed to delete {file_path}: {e}")
+                # Delete training images and attendance files, both trees at once
+                with ThreadPoolExecutor(max_workers=2) as pool:
+                    list(pool.map(self._clear_directory, (TRAINING_IMAGE_DIR, ATTENDANCE_DIR)))
                 
                 # Reset database
                 self.db.close()
                 os.unlink(STUDENT_DB_PATH)
                 self.db = ThreadSafeDatabase()
+                self._name_cache.clear()
+                self._stats_dirty = True
+                self._recognizer = None
+                FaceEmbedder.clear_gallery()
                 
                 self.update_status("System reset successfully")
                 self.refresh_all_data()
@@ -847,27 +1199,45 @@ class AttendanceSystem:
                 messagebox.showerror("Error", f"Failed to reset system: {e}")
                 self.canvas.play_sound("error.wav")
     
+    @staticmethod
+    def _clear_directory(directory):
+        """Delete everything under a directory, leaving it empty"""
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+    
     def update_status(self, message):
-        """Update the status bar message"""
+        """Update the status bar message; safe to call from worker threads"""
+        if threading.current_thread() is not threading.main_thread():
+            self.window.after(0, self.update_status, message)
+            return
+        
         self.status_var.set(message)
-        self.window.update()
+        # Repaint promptly for long main-thread operations, but at a bounded rate
+        now = time.monotonic()
+        if now - self._last_status_redraw >= STATUS_REDRAW_INTERVAL:
+            self._last_status_redraw = now
+            self.window.update_idletasks()
     
     def update_stats(self):
         """Update the statistics display"""
         try:
-            # Get student count
-            with self.db_lock:
-                students = self.db.execute('get_all_students')
-                student_count = len(students)
-                
-                # Get today's attendance count
-                today = datetime.datetime.now().strftime('%Y-%m-%d')
-                attendance = self.db.execute('get_attendance_records', today)
-                attendance_count = len(attendance)
-                
-                # Get total attendance count
-                all_attendance = self.db.execute('get_attendance_records')
-                total_attendance = len(all_attendance)
+            # Recount only after a write or when the day rolls over
+            today = datetime.datetime.now().strftime('%Y-%m-%d')
+            if self._stats_dirty or self._stats_cache.get('date') != today:
+                # Cleared first so a write landing during the query isn't lost
+                self._stats_dirty = False
+                student_count, attendance_count, total_attendance = self.db.execute(
+                    'get_stats', today)
+                self._stats_cache = {
+                    'date': today,
+                    'students': student_count,
+                    'today': attendance_count,
+                    'total': total_attendance,
+                }
+            else:
+                student_count = self._stats_cache['students']
+                attendance_count = self._stats_cache['today']
+                total_attendance = self._stats_cache['total']
             
             stats_text = (
                 f"📊 System Statistics:\n\n"
@@ -883,17 +1253,61 @@ class AttendanceSystem:
     
     def refresh_attendance(self):
         """Refresh the attendance display"""
-        date = self.date_var.get()
-        with self.db_lock:
-            records = self.db.execute('get_attendance_records', date)
+        self._attendance_generation += 1
+        self._attendance_date = self.date_var.get()
+        self._attendance_offset = 0
+        self._attendance_has_more = False
+        self._load_attendance_page(replace=True)
+    
+    def _load_attendance_page(self, replace=False):
+        """Fetch the next page of attendance records"""
+        self._attendance_loading = True
+        
+        # Fetch in a separate thread; the tree is filled back on the UI thread
+        threading.Thread(
+            target=self._refresh_attendance_thread,
+            args=(self._attendance_generation, self._attendance_date,
+                  self._attendance_offset, replace),
+            daemon=True
+        ).start()
+    
+    def _refresh_attendance_thread(self, generation, date, offset, replace):
+        """Thread function for fetching attendance records"""
+        try:
+            records = self.db.execute('get_attendance_records', date,
+                                      ATTENDANCE_PAGE_SIZE, offset)
+        except Exception as e:
+            print(f"Error loading attendance records: {e}")
+            records = None
+        finally:
+            self.db.release_connection()
+        self.window.after(0, self._populate_attendance, generation, records, replace)
+    
+    def _populate_attendance(self, generation, records, replace):
+        """Add a page of records to the attendance display"""
+        if generation != self._attendance_generation:
+            return  # Superseded by a newer refresh
+        self._attendance_loading = False
+        if records is None:
+            return
         
         # Clear existing data
-        for item in self.attendance_tree.get_children():
-            self.attendance_tree.delete(item)
+        if replace:
+            self.attendance_tree.delete(*self.attendance_tree.get_children())
         
         # Add new records
         for record in records:
             self.attendance_tree.insert('', 'end', values=record)
+        
+        self._attendance_offset += len(records)
+        self._attendance_has_more = len(records) == ATTENDANCE_PAGE_SIZE
+    
+    def _on_attendance_scroll(self, first, last):
+        """Update the scrollbar and load more records near the bottom"""
+        self.attendance_scrollbar.set(first, last)
+        if (float(last) >= 0.9 and self._attendance_has_more
+                and not self._attendance_loading):
+            self._load_attendance_page()
     
     def refresh_all_data(self):
         """Refresh all data displays"""
@@ -905,20 +1319,16 @@ class AttendanceSystem:
     def generate_report(self):
         """Generate an attendance report"""
         date = self.date_var.get()
-        with self.db_lock:
-            records = self.db.execute('get_attendance_records', date)
+        records = self.db.execute('get_attendance_records', date)
         
         if not records:
             messagebox.showwarning("No Data", f"No attendance records for {date}")
             return
         
-        # Create a simple report
-        report_window = tk.Toplevel(self.window)
-        report_window.title(f"Attendance Report - {date}")
-        report_window.geometry("800x600")
-        
-        # Create figure for matplotlib
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(8, 6))
+        # Create figure for matplotlib; a bare Figure stays out of pyplot's
+        # global registry, so closed reports are freed
+        fig = Figure(figsize=(8, 6))
+        ax1, ax2 = fig.subplots(2, 1)
         fig.suptitle(f"Attendance Report - {date}")
         
         # Prepare data
@@ -927,29 +1337,50 @@ class AttendanceSystem:
         times = [record[3] for record in records]
         
         # Bar chart of attendance counts
-        unique_students = list(set(student_ids))
-        counts = [student_ids.count(id) for id in unique_students]
+        unique_students, counts = np.unique(np.asarray(student_ids), return_counts=True)
         ax1.bar(unique_students, counts)
         ax1.set_title("Attendance Count per Student")
         ax1.set_xlabel("Student ID")
         ax1.set_ylabel("Count")
         
-        # Time distribution
-        time_objects = [datetime.datetime.strptime(t, "%H:%M:%S") for t in times]
-        hours = [t.hour + t.minute/60 for t in time_objects]
+        # Time distribution, reading the digits of "%H:%M:%S" strings directly; a ninth
+        # byte makes over-long values show up as a non-NUL terminator
+        clock = np.array([str(t).encode('ascii', 'replace') for t in times],
+                         dtype='S9').view(np.uint8).reshape(-1, 9)
+        digits = clock[:, [0, 1, 3, 4, 6, 7]] - np.uint8(ord('0'))  # Bytes below '0' wrap past 9
+        valid = ((clock[:, 2] == ord(':')) & (clock[:, 5] == ord(':')) & (clock[:, 8] == 0)
+                 & (digits <= 9).all(axis=1))
+        digits = digits[valid].astype(np.float64)
+        hours = digits[:, 0] * 10 + digits[:, 1] + (digits[:, 2] * 10 + digits[:, 3]) / 60
+        
+        # Anything else goes through strptime; unparseable times are left out
+        fallback = []
+        for i in np.flatnonzero(~valid):
+            try:
+                t = datetime.datetime.strptime(str(times[i]), "%H:%M:%S")
+            except ValueError:
+                continue
+            fallback.append(t.hour + t.minute / 60)
+        if fallback:
+            hours = np.concatenate([hours, fallback])
         ax2.hist(hours, bins=24, range=(0, 24))
         ax2.set_title("Time Distribution")
         ax2.set_xlabel("Hour of Day")
         ax2.set_ylabel("Count")
         
-        # Embed plot in Tkinter window
+        # Save report to file before any Tk canvas is attached
+        report_filename = os.path.join(REPORTS_DIR, f"Attendance_Report_{date}.pdf")
+        fig.savefig(report_filename, dpi=100)
+        
+        # Create a simple report
+        report_window = tk.Toplevel(self.window)
+        report_window.title(f"Attendance Report - {date}")
+        report_window.geometry("800x600")
+        
+        # Embed plot in Tkinter window, rendering once Tk is idle
         canvas = FigureCanvasTkAgg(fig, master=report_window)
-        canvas.draw()
         canvas.get_tk_widget().pack(fill='both', expand=True)
-        
-        # Save report to file
-        report_filename = os.path.join(REPORTS_DIR, f"Attendance_Report_{date}.pdf")
-        fig.savefig(report_filename)
+        canvas.draw_idle()
         
         self.update_status(f"Report generated: {report_filename}")
         self.canvas.play_sound("success.wav")
@@ -981,6 +1412,8 @@ class AttendanceSystem:
             return
         
         self.camera_active = True
+        self._capture_cancel = threading.Event()
+        self._open_capture_preview()
         self.capture_thread = threading.Thread(
             target=self._capture_images, 
             args=(student_id, name),
@@ -995,52 +1428,78 @@ class AttendanceSystem:
             if not cam.isOpened():
                 raise RuntimeError("Could not open camera")
                 
-            detector = cv2.CascadeClassifier(HAARCASCADE_PATH)
-            if detector.empty():
-                raise RuntimeError("Could not load face detection model")
+            detector = self._get_detector(1.3, 5)
+            
+            # JPEG encoding and disk writes happen off the capture loop
+            writer_q = queue.Queue(maxsize=64)
+            writer = threading.Thread(target=self._write_images, args=(writer_q,), daemon=True)
+            writer.start()
+            last_sound_time = 0
+            last_sample_time = 0
+            samples = []  # FACE_SIZE crops for the packed training arrays
                 
             sample_num = 0
             required_samples = 30  # Number of samples to capture
             
             self.update_status(f"Capturing images for {name} (ID: {student_id})...")
             
-            while sample_num < required_samples and self.camera_active:
+            while (sample_num < required_samples and self.camera_active
+                   and not self._capture_cancel.is_set()):
                 ret, img = cam.read()
                 if not ret:
                     raise RuntimeError("Failed to capture image")
                     
-                gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-                faces = detector.detectMultiScale(gray, 1.3, 5)
+                gray = self._to_gray(img)
+                faces = detector.detect(img, gray)
+                
+                # The preview runs at camera rate, but samples are only taken at intervals
+                now = time.monotonic()
+                take_sample = now - last_sample_time >= CAPTURE_SAMPLE_INTERVAL
+                if take_sample and len(faces):
+                    last_sample_time = now
                 
                 for (x, y, w, h) in faces:
                     cv2.rectangle(img, (x, y), (x+w, y+h), (255, 0, 0), 2)
-                    sample_num += 1
-                    img_path = os.path.join(TRAINING_IMAGE_DIR, f"{name}.{student_id}.{sample_num}.jpg")
-                    cv2.imwrite(img_path, gray[y:y+h, x:x+w])
+                    if take_sample:
+                        sample_num += 1
+                        img_path = os.path.join(TRAINING_IMAGE_DIR, f"{name}.{student_id}.{sample_num}.jpg")
+                        writer_q.put((img_path, gray[y:y+h, x:x+w].copy()))
+                        samples.append(cv2.resize(gray[y:y+h, x:x+w], FACE_SIZE,
+                                                  interpolation=cv2.INTER_AREA))
                     cv2.putText(
                         img, f"Samples: {sample_num}/{required_samples}", 
                         (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2
                     )
-                    cv2.imshow('Register Face', img)
-                    self.canvas.play_sound("capture.wav")
                 
-                if cv2.waitKey(100) & 0xFF == ord('q'):
-                    break
+                # Tk images must be built on the main thread, so hand it the pixels
+                self.window.after(0, self._show_capture_preview,
+                                  cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+                
+                if len(faces) and now - last_sound_time >= CAPTURE_SOUND_INTERVAL:
+                    self.canvas.play_sound("capture.wav")
+                    last_sound_time = now
                     
                 # Update status
                 self.update_status(
                     f"Capturing {name} (ID: {student_id}): {sample_num}/{required_samples} samples"
                 )
             
+            # Wait for every sample to reach disk before registering the student
+            writer_q.put(None)
+            writer.join()
+            
             cam.release()
-            cv2.destroyAllWindows()
+            self.window.after(0, self._close_capture_preview)
             
             if sample_num >= required_samples:
                 # Save student to database
-                with self.db_lock:
-                    success = self.db.execute('add_student', student_id, name)
+                success = self.db.execute('add_student', student_id, name)
                 
                 if success:
+                    self._name_cache[student_id] = name
+                    self._stats_dirty = True
+                    self._append_training_data(samples, student_id)
+                    self._update_model(samples, student_id)
                     message = f"Successfully captured {sample_num} images for {name} (ID: {student_id})"
                     self.update_status(message)
                     messagebox.showinfo("Success", message)
@@ -1060,9 +1519,44 @@ class AttendanceSystem:
             self.canvas.play_sound("error.wav")
         finally:
             self.camera_active = False
+            if 'writer' in locals() and writer.is_alive():
+                writer_q.put(None)
             if 'cam' in locals() and cam.isOpened():
                 cam.release()
-            cv2.destroyAllWindows()
+            self.window.after(0, self._close_capture_preview)
+            self.db.release_connection()
+    
+    def _open_capture_preview(self):
+        """Open the window showing the camera feed while registering a face"""
+        self.preview_window = tk.Toplevel(self.window)
+        self.preview_window.title("Register Face - press 'q' to stop")
+        self.preview_window.protocol("WM_DELETE_WINDOW", self._capture_cancel.set)
+        self.preview_window.bind('q', lambda e: self._capture_cancel.set())
+        self.preview_label = tk.Label(self.preview_window, bg='black')
+        self.preview_label.pack()
+    
+    def _show_capture_preview(self, frame_rgb):
+        """Display an RGB camera frame in the capture preview window"""
+        if self.preview_window is None:
+            return
+        photo = ImageTk.PhotoImage(Image.fromarray(frame_rgb))
+        self.preview_label.configure(image=photo)
+        self.preview_label.image = photo  # Keep a reference so Tk doesn't drop it
+    
+    def _close_capture_preview(self):
+        """Close the capture preview window if it is open"""
+        if self.preview_window is not None:
+            self.preview_window.destroy()
+            self.preview_window = None
+    
+    @staticmethod
+    def _write_images(writer_q):
+        """Thread function saving queued (path, image) pairs until a None arrives"""
+        while True:
+            item = writer_q.get()
+            if item is None:
+                break
+            cv2.imwrite(*item)
     
     def train_images(self):
         """Train the face recognition model"""
@@ -1088,14 +1582,24 @@ class AttendanceSystem:
     def _train_images_thread(self):
         """Thread function for training images"""
         try:
-            recognizer = cv2.face.LBPHFaceRecognizer_create()
             faces, ids = self.get_images_and_labels(TRAINING_IMAGE_DIR)
             
             if not faces:
                 raise ValueError("No faces found in training images.")
-                
-            recognizer.train(faces, np.array(ids))
-            recognizer.save(TRAINNER_PATH)
+            
+            if FaceEmbedder.available():
+                embedder = self._get_embedder()
+                embeddings = np.concatenate([
+                    embedder.embed(faces[i:i + EMBEDDING_BATCH_SIZE])
+                    for i in range(0, len(faces), EMBEDDING_BATCH_SIZE)
+                ])
+                FaceEmbedder.save_gallery(embeddings, np.array(ids))
+            else:
+                recognizer = cv2.face.LBPHFaceRecognizer_create()
+                recognizer.train(faces, np.array(ids))
+                recognizer.save(TRAINNER_PATH)
+                # Recognition picks up the new model without re-reading the file
+                self._recognizer = recognizer
             
             self.window.after(0, lambda: [
                 self.update_status("Model trained successfully"),
@@ -1110,31 +1614,117 @@ class AttendanceSystem:
                 self.canvas.play_sound("error.wav")
             ])
     
+    def _get_detector(self, scale_factor, min_neighbors):
+        """Return the face detector for these parameters, loading it on first use"""
+        key = (scale_factor, min_neighbors)
+        if key not in self._detectors:
+            self._detectors[key] = FaceDetector(scale_factor, min_neighbors)
+        return self._detectors[key]
+    
+    def _get_recognizer(self):
+        """Return the trained LBPH recognizer, reading it from disk on first use"""
+        if self._recognizer is None:
+            recognizer = cv2.face.LBPHFaceRecognizer_create()
+            recognizer.read(TRAINNER_PATH)
+            self._recognizer = recognizer
+        return self._recognizer
+    
+    def _get_embedder(self):
+        """Return the DNN face embedder, loading the network on first use"""
+        if self._embedder is None:
+            self._embedder = FaceEmbedder()
+        return self._embedder
+    
+    def _to_gray(self, frame):
+        """Convert a BGR frame to grayscale into the reused gray buffer"""
+        if self._gray_buf is None or self._gray_buf.shape != frame.shape[:2]:
+            self._gray_buf = np.empty(frame.shape[:2], dtype=np.uint8)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._gray_buf)
+    
+    def _face_roi(self, face_region, index):
+        """Resize a face crop to FACE_SIZE into the index-th pooled buffer"""
+        # Each face in a frame gets its own buffer while its predict is in flight
+        while index >= len(self._roi_pool):
+            self._roi_pool.append(np.empty(FACE_SIZE, dtype=np.uint8))
+        buf = self._roi_pool[index]
+        return cv2.resize(face_region, FACE_SIZE, dst=buf, interpolation=cv2.INTER_AREA)
+    
+    def _append_training_data(self, faces, student_id):
+        """Append a student's face samples to the packed training arrays"""
+        if not os.path.exists(TRAINING_FACES_PATH):
+            # First pack includes this student's JPEGs along with any older ones
+            self.get_images_and_labels(TRAINING_IMAGE_DIR)
+            return
+        ids = np.full(len(faces), int(student_id), dtype=np.int32)
+        np.save(TRAINING_FACES_PATH, np.concatenate([np.load(TRAINING_FACES_PATH), np.stack(faces)]))
+        np.save(TRAINING_IDS_PATH, np.concatenate([np.load(TRAINING_IDS_PATH), ids]))
+    
+    def _update_model(self, faces, student_id):
+        """Add a newly registered student to an already trained model without retraining"""
+        ids = np.full(len(faces), int(student_id), dtype=np.int32)
+        if FaceEmbedder.available() and os.path.exists(EMBEDDINGS_PATH):
+            embeddings, gallery_ids = FaceEmbedder.load_gallery()
+            FaceEmbedder.save_gallery(
+                np.concatenate([embeddings, self._get_embedder().embed(faces)]),
+                np.concatenate([gallery_ids, ids])
+            )
+        elif os.path.exists(TRAINNER_PATH):
+            # LBPH histograms are per-sample, so updating matches a full retrain
+            recognizer = self._get_recognizer()
+            recognizer.update(faces, ids)
+            recognizer.save(TRAINNER_PATH)
+    
     def get_images_and_labels(self, path):
-        """Get images and labels from training directory"""
+        """Get training faces and labels as views of the packed arrays, packing the
+        JPEGs in path on first use"""
+        if not os.path.exists(TRAINING_FACES_PATH):
+            faces, ids = self._decode_training_images(path)
+            if not faces:
+                return [], []
+            np.save(TRAINING_FACES_PATH, np.stack(faces))
+            np.save(TRAINING_IDS_PATH, np.array(ids, dtype=np.int32))
+        
+        # One sequential memory-mapped read instead of a decode per sample
+        faces = np.load(TRAINING_FACES_PATH, mmap_mode='r')
+        ids = np.load(TRAINING_IDS_PATH)
+        return list(faces), ids.tolist()
+    
+    def _decode_training_images(self, path):
+        """Get images and labels from training directory, decoding in parallel"""
         image_paths = [os.path.join(path, f) for f in os.listdir(path) if f.endswith('.jpg')]
-        faces = []
-        ids = []
         
-        for image_path in image_paths:
+        def load(image_path):
             try:
-                pil_image = Image.open(image_path).convert('L')
-                image_np = np.array(pil_image, 'uint8')
-                
                 # Get ID from filename (format: Name.ID.Number.jpg)
-                id_str = os.path.split(image_path)[-1].split(".")[1]
+                id_str = os.path.basename(image_path).split(".")[1]
                 if not id_str.isdigit():
-                    continue
+                    return None
                 
-                id = int(id_str)
-                faces.append(image_np)
-                ids.append(id)
+                # cv2 decodes without holding the GIL, so the pool uses every core
+                image_np = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+                if image_np is None:
+                    raise ValueError("could not decode image")
+                return cv2.resize(image_np, FACE_SIZE, interpolation=cv2.INTER_AREA), int(id_str)
             except Exception as e:
                 print(f"Skipping invalid image {image_path}: {str(e)}")
-                continue
-                
+                return None
+        
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+            results = [r for r in pool.map(load, image_paths) if r is not None]
+        
+        faces = [face for face, _ in results]
+        ids = [id for _, id in results]
         return faces, ids
     
+    def get_student_name(self, student_id):
+        """Get student name by ID, querying the database only on a cache miss"""
+        name = self._name_cache.get(student_id)
+        if name is None:
+            name = self.db.execute('get_student_name', student_id)
+            if name:
+                self._name_cache[student_id] = name
+        return name
+    
     def track_images(self):
         """Mark attendance using face recognition"""
         # Check if camera is already in use
@@ -1143,7 +1733,7 @@ class AttendanceSystem:
             return
         
         # Check if trained model exists
-        if not os.path.exists(TRAINNER_PATH):
+        if not (os.path.exists(TRAINNER_PATH) or os.path.exists(EMBEDDINGS_PATH)):
             messagebox.showwarning("Warning", "No trained model found. Please train the model first.")
             self.canvas.play_sound("error.wav")
             return
@@ -1158,69 +1748,120 @@ class AttendanceSystem:
     def _track_images_thread(self):
         """Thread function for tracking images and marking attendance"""
         try:
-            recognizer = cv2.face.LBPHFaceRecognizer_create()
-            recognizer.read(TRAINNER_PATH)
+            # Prefer the DNN embedder when a gallery was enrolled with it
+            if FaceEmbedder.available() and os.path.exists(EMBEDDINGS_PATH):
+                embedder = self._get_embedder()
+                embedder.load_gallery()
+                recognizer = None
+            else:
+                embedder = None
+                recognizer = self._get_recognizer()
             
-            face_cascade = cv2.CascadeClassifier(HAARCASCADE_PATH)
-            if face_cascade.empty():
-                raise RuntimeError("Could not load face detection model")
+            face_detector = self._get_detector(1.2, 5)
+            predict_pool = ThreadPoolExecutor(max_workers=max(1, os.cpu_count() // 2))
             
             cam = cv2.VideoCapture(0)
             if not cam.isOpened():
                 raise RuntimeError("Could not open camera.")
+            # Keep the driver queue short so slow frames don't build up latency
+            cam.set(cv2.CAP_PROP_BUFFERSIZE, 1)
                 
             font = cv2.FONT_HERSHEY_SIMPLEX
             attendance_marked = set()  # Track which students have been marked today
+            attendance_seen = set()  # Recognized this session, marked or still buffered
+            unknown_count = len(os.listdir(UNKNOWN_IMAGES_DIR))
+            frame_count = 0
+            last_frame_sig = None
+            last_detect_time = 0
+            faces = []
             
             self.update_status("Marking attendance... Press 'q' to stop")
             
             while self.camera_active:
-                ret, im = cam.read()
+                # Discard any frame left buffered while the last one was processed
+                cam.grab()
+                ret = cam.grab()
+                if ret:
+                    ret, im = cam.retrieve()
                 if not ret:
                     raise RuntimeError("Failed to capture image from camera.")
                     
-                gray = cv2.cvtColor(im, cv2.COLOR_BGR2GRAY)
-                faces = face_cascade.detectMultiScale(gray, 1.2, 5)
+                gray = self._to_gray(im)
                 
-                for (x, y, w, h) in faces:
+                # Reuse the previous detections while the scene is unchanged
+                frame_sig = int(cv2.resize(gray, (16, 16), interpolation=cv2.INTER_AREA).sum())
+                now = time.monotonic()
+                if (last_frame_sig is None
+                        or abs(frame_sig - last_frame_sig) >= FRAME_DIFF_THRESHOLD
+                        or now - last_detect_time >= DETECT_REFRESH_INTERVAL):
+                    faces = face_detector.detect(im, gray)
+                    last_frame_sig = frame_sig
+                    last_detect_time = now
+                
+                if embedder is not None:
+                    # One batched forward pass and matrix product for every face; crops
+                    # stay grayscale to match the enrolled training images
+                    predictions = [
+                        (id, score, score >= EMBEDDING_MATCH_THRESHOLD,
+                         score < EMBEDDING_UNKNOWN_THRESHOLD)
+                        for id, score in embedder.match(
+                            [gray[y:y+h, x:x+w] for (x, y, w, h) in faces])
+                    ] if len(faces) else []
+                else:
+                    # Predict every face in parallel; OpenCV releases the GIL
+                    futures = [
+                        predict_pool.submit(recognizer.predict,
+                                            self._face_roi(gray[y:y+h, x:x+w], i))
+                        for i, (x, y, w, h) in enumerate(faces)
+                    ]
+                    predictions = []
+                    for future in futures:
+                        id, confidence = future.result()
+                        # Lower LBPH confidence is more certain; above 75 is very uncertain
+                        predictions.append((id, confidence, confidence < 50, confidence > 75))
+                
+                for (x, y, w, h), (id, confidence, recognized, uncertain) in zip(faces, predictions):
                     cv2.rectangle(im, (x, y), (x+w, y+h), (225, 0, 0), 2)
-                    id, confidence = recognizer.predict(gray[y:y+h, x:x+w])
                     
-                    # Check confidence level (lower is more confident)
-                    if confidence < 50:
-                        with self.db_lock:
-                            student_name = self.db.execute('get_student_name', str(id))
+                    if recognized:
+                        student_name = self.get_student_name(str(id))
                         
                         if student_name:
-                            # Mark attendance if not already marked today
-                            if id not in attendance_marked:
-                                with self.db_lock:
-                                    marked = self.db.execute('mark_attendance', str(id), student_name)
-                                
-                                if marked:
-                                    attendance_marked.add(id)
-                                    self.canvas.play_sound("success.wav")
-                                    self.window.after(0, self.refresh_attendance)
-                                    self.window.after(0, self.update_stats)
+                            # Buffer attendance if not already seen this session
+                            if str(id) not in attendance_seen:
+                                attendance_seen.add(str(id))
+                                self._pending_attendance.append((str(id), student_name))
                             
                             display_text = f"{id}-{student_name} ({confidence:.1f})"
                         else:
                             display_text = f"Unknown ID: {id}"
                     else:
                         display_text = "Unknown"
-                        if confidence > 75:  # Very uncertain
+                        if uncertain:
                             # Save unknown face image
-                            unknown_count = len(os.listdir(UNKNOWN_IMAGES_DIR)) + 1
+                            unknown_count += 1
                             unknown_img_path = os.path.join(
                                 UNKNOWN_IMAGES_DIR, f"Unknown_{unknown_count}.jpg")
                             cv2.imwrite(unknown_img_path, im[y:y+h, x:x+w])
                     
                     cv2.putText(im, display_text, (x, y+h), font, 1, (255, 255, 255), 2)
                 
+                # Write buffered recognitions every few frames in one transaction
+                frame_count += 1
+                if frame_count % ATTENDANCE_FLUSH_FRAMES == 0:
+                    marked = self._flush_pending_attendance()
+                    if marked:
+                        attendance_marked.update(marked)
+                        self.canvas.play_sound("success.wav")
+                        self.window.after(0, self.refresh_attendance)
+                        self.window.after(0, self.update_stats)
+                
                 cv2.imshow('Marking Attendance', im)
                 if cv2.waitKey(1) == ord('q'):
                     break
             
+            attendance_marked.update(self._flush_pending_attendance())
+            
             # Show summary of marked attendance
             if attendance_marked:
                 marked_count = len(attendance_marked)
@@ -1239,11 +1880,29 @@ class AttendanceSystem:
             ])
         finally:
             self.camera_active = False
+            if 'predict_pool' in locals():
+                predict_pool.shutdown(wait=False)
             if 'cam' in locals() and cam.isOpened():
                 cam.release()
             cv2.destroyAllWindows()
+            try:
+                # Don't lose recognitions buffered before an error
+                self._flush_pending_attendance()
+            except Exception as e:
+                print(f"Failed to save pending attendance: {e}")
+            self.db.release_connection()
             self.window.after(0, self.refresh_all_data)
     
+    def _flush_pending_attendance(self):
+        """Write buffered attendance in one transaction and return the newly marked IDs"""
+        if not self._pending_attendance:
+            return []
+        marked = self.db.execute('mark_attendance_batch', self._pending_attendance)
+        self._pending_attendance.clear()
+        if marked:
+            self._stats_dirty = True
+        return marked
+    
     def create_status_bar(self):
         """Create status bar at bottom of window"""
         self.status_var = tk.StringVar()
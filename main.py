@@ -1,22 +1,29 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk
 import cv2
 import os
 import sqlite3
 import numpy as np
 from PIL import Image, ImageTk, ImageDraw
 import datetime
+import math
 import time
 import threading
+import contextlib
+import functools
+import hmac
 import random
+import re
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import queue
 import winsound
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
 
 # Configuration  
-BASE_DIR = os.path.dirname(os.path.abspath(_file_))
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 TRAINING_IMAGE_DIR = os.path.join(BASE_DIR, "TrainingImage")
 STUDENT_DB_PATH = os.path.join(BASE_DIR, "StudentDetails", "student_database.db")
 TRAINNER_PATH = os.path.join(TRAINING_IMAGE_DIR, "Trainner.yml")
@@ -25,6 +32,10 @@ ATTENDANCE_DIR = os.path.join(BASE_DIR, "Attendance")
 UNKNOWN_IMAGES_DIR = os.path.join(BASE_DIR, "ImagesUnknown")
 SOUNDS_DIR = os.path.join(BASE_DIR, "Sounds")
 REPORTS_DIR = os.path.join(BASE_DIR, "Reports")
+DETECT_SCALE = 0.5  # Frames are downscaled by this factor before face detection
+AUTH_CACHE_SIZE = 128  # Recently verified admin logins that skip the KDF
+AUTH_FAILURE_DELAY = 0.2  # Seconds added to every failed login
+PARTICLE_BITS = 16  # Particle coordinates are uint16 fractions of the canvas size
 
 # Create directories if they don't exist
 os.makedirs(TRAINING_IMAGE_DIR, exist_ok=True)
@@ -34,187 +45,294 @@ os.makedirs(SOUNDS_DIR, exist_ok=True)
 os.makedirs(REPORTS_DIR, exist_ok=True)
 os.makedirs(os.path.dirname(STUDENT_DB_PATH), exist_ok=True)
 
+# Unit direction vectors for the web strands and the spider's legs
+_WEB_DIRS = [(math.cos(math.radians(a)), math.sin(math.radians(a))) for a in range(0, 360, 30)]
+_LEG_DIRS = [(math.cos(math.radians(a)), math.sin(math.radians(a))) for a in range(0, 360, 45)]
+
+@functools.lru_cache(maxsize=1)
+def _build_spider_photo():
+    """Load or draw the spider sprite once and share it between canvases"""
+    try:
+        # Try to load spider image if available
+        spider_img = Image.open("spider.png").resize((100, 100))
+    except:
+        # Fallback to drawing a simple spider
+        spider_img = Image.new('RGBA', (100, 100), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(spider_img)
+        # Body
+        draw.ellipse((40, 40, 60, 60), fill='black')
+        # Head
+        draw.ellipse((45, 30, 55, 40), fill='black')
+        # Legs
+        for dx, dy in _LEG_DIRS:
+            draw.line((50 + 10*dx, 50 + 10*dy, 50 + 30*dx, 50 + 30*dy),
+                      fill='black', width=3)
+    return ImageTk.PhotoImage(spider_img)
+
+_AUTH_PEPPER = os.urandom(32)  # Keys the in-process login cache; never stored
+_PW_POLICY = re.compile(r'^(?=.*[A-Z])(?=.*\d).{8,}$')  # 8+ chars with an uppercase letter and a digit
+
+# Admin passwords are stored as argon2 hashes, shared with attendence.py's database
+password_hasher = PasswordHasher()
+
 class ThreadSafeDatabase:
-    def _init_(self):
-        self.db_queue = queue.Queue()
-        self.result_queue = queue.Queue()
-        self.worker_thread = threading.Thread(target=self._db_worker, daemon=True)
-        self.worker_thread.start()
-    
-    def _db_worker(self):
-        """Worker thread that handles all database operations"""
-        conn = sqlite3.connect(STUDENT_DB_PATH)
-        conn.execute("PRAGMA journal_mode=WAL")  # Enable WAL mode for better concurrency
-        cursor = conn.cursor()
-        
-        # Create tables if they don't exist
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS students (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                registration_date TEXT,
-                last_attendance TEXT
-            )
-        ''')
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS attendance (
-                id TEXT,
-                name TEXT,
-                date TEXT,
-                time TEXT,
-                FOREIGN KEY(id) REFERENCES students(id)
-            )
-        ''')
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS admin (
-                username TEXT PRIMARY KEY,
-                password TEXT NOT NULL
-            )
-        ''')
-        
-        # Insert default admin account if none exists
-        cursor.execute('SELECT 1 FROM admin')
-        if not cursor.fetchone():
-            cursor.execute('''
-                INSERT INTO admin (username, password)
-                VALUES (?, ?)
-            ''', ('admin', 'admin123'))  # Default credentials
-        
-        conn.commit()
-        
-        while True:
-            task = self.db_queue.get()
-            if task == 'STOP':
-                conn.close()
-                break
-                
-            method, args, kwargs = task
-            try:
-                if method == 'add_student':
-                    result = self._add_student(cursor, *args, **kwargs)
-                elif method == 'mark_attendance':
-                    result = self._mark_attendance(cursor, *args, **kwargs)
-                elif method == 'get_student_name':
-                    result = self._get_student_name(cursor, *args, **kwargs)
-                elif method == 'get_attendance_records':
-                    result = self._get_attendance_records(cursor, *args, **kwargs)
-                elif method == 'get_all_students':
-                    result = self._get_all_students(cursor, *args, **kwargs)
-                elif method == 'verify_admin':
-                    result = self._verify_admin(cursor, *args, **kwargs)
-                elif method == 'change_admin_password':
-                    result = self._change_admin_password(cursor, *args, **kwargs)
-                elif method == 'get_student_by_id':
-                    result = self._get_student_by_id(cursor, *args, **kwargs)
-                else:
-                    result = ValueError(f"Unknown method: {method}")
-                
-                conn.commit()
-                self.result_queue.put(result)
-            except Exception as e:
-                self.result_queue.put(e)
-            finally:
-                self.db_queue.task_done()
-    
-    def execute(self, method, *args, **kwargs):
-        """Execute a database method in the worker thread"""
-        self.db_queue.put((method, args, kwargs))
-        result = self.result_queue.get()
-        if isinstance(result, Exception):
-            raise result
-        return result
-    
-    def _add_student(self, cursor, student_id, name):
+    # Hot admin statements as fixed strings, so each connection's statement
+    # cache hands back the same compiled statement on every call
+    VERIFY_ADMIN_SQL = 'SELECT password_hash FROM admin WHERE username = ?'
+    CHANGE_ADMIN_PASSWORD_SQL = 'UPDATE admin SET password_hash = ? WHERE username = ?'
+    
+    def __init__(self):
+        # Each thread gets its own connection; WAL lets readers run alongside the writer
+        self._local = threading.local()
+        self._connections = []
+        self._idle_connections = []  # Released by finished worker threads
+        self._connections_lock = threading.Lock()
+        self._create_schema()
+    
+    def _conn(self):
+        """Return the calling thread's connection, taking an idle one or opening one on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+        with self._connections_lock:
+            conn = self._idle_connections.pop() if self._idle_connections else None
+        if conn is None:
+            conn = sqlite3.connect(STUDENT_DB_PATH, check_same_thread=False,
+                                   isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")  # Enable WAL mode for better concurrency
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA busy_timeout=30000")  # Wait for the writer instead of failing
+            with self._connections_lock:
+                self._connections.append(conn)
+        self._local.conn = conn
+        return conn
+    
+    def release_connection(self):
+        """Return the calling thread's connection to the pool for other threads"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._local.conn = None
+            with self._connections_lock:
+                self._idle_connections.append(conn)
+    
+    @contextlib.contextmanager
+    def _transaction(self):
+        """Run a block of statements as one write transaction"""
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+    
+    def _create_schema(self):
+        """Create tables and the default admin account"""
+        with self._transaction() as conn:
+            # Create tables if they don't exist
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS students (
+                    id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    registration_date TEXT,
+                    last_attendance TEXT
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS attendance (
+                    id TEXT,
+                    name TEXT,
+                    date TEXT,
+                    time TEXT,
+                    FOREIGN KEY(id) REFERENCES students(id)
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS admin (
+                    username TEXT PRIMARY KEY,
+                    password_hash TEXT NOT NULL
+                )
+            ''')
+            
+            # Rebuild admin tables from older databases that still have a
+            # password column, hashing plaintext and keeping existing hashes
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(admin)')}
+            if 'password' in columns:
+                hash_column = 'password_hash' if 'password_hash' in columns else 'NULL'
+                accounts = []
+                for username, password, password_hash in conn.execute(
+                    f'SELECT username, password, {hash_column} FROM admin'
+                ).fetchall():
+                    if password_hash:
+                        accounts.append((username, password_hash))
+                    elif isinstance(password, str) and password.startswith('$argon2'):
+                        accounts.append((username, password))
+                    elif isinstance(password, str) and password:
+                        accounts.append((username, password_hasher.hash(password)))
+                    # Anything else (empty, or a hash argon2 can't read) is dropped
+                conn.execute('DROP TABLE admin')
+                conn.execute('''
+                    CREATE TABLE admin (
+                        username TEXT PRIMARY KEY,
+                        password_hash TEXT NOT NULL
+                    )
+                ''')
+                conn.executemany('''
+                    INSERT INTO admin (username, password_hash)
+                    VALUES (?, ?)
+                ''', accounts)
+            
+            # attendence.py owns the attendance indexes; this one only duplicated them
+            conn.execute('DROP INDEX IF EXISTS idx_att_date_id')
+            # Only refreshes planner statistics that are missing or stale
+            conn.execute('PRAGMA optimize')
+            
+            # Insert default admin account if none exists
+            if conn.execute('SELECT 1 FROM admin').fetchone() is None:
+                conn.execute('''
+                    INSERT INTO admin (username, password_hash)
+                    VALUES (?, ?)
+                ''', ('admin', password_hasher.hash('admin123')))  # Default credentials
+    
+    def add_student(self, student_id, name):
         """Add a new student to the database"""
-        registration_date = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        cursor.execute('''
+        registration_date = datetime.datetime.now().isoformat(sep=' ', timespec='seconds')
+        cursor = self._conn().execute('''
             INSERT OR IGNORE INTO students (id, name, registration_date) 
             VALUES (?, ?, ?)
         ''', (student_id, name, registration_date))
         return cursor.rowcount > 0
     
-    def _mark_attendance(self, cursor, student_id, name):
-        """Mark attendance for a student"""
-        date = datetime.datetime.now().strftime('%Y-%m-%d')
-        time_str = datetime.datetime.now().strftime('%H:%M:%S')
-        
-        # Check if already marked today
-        cursor.execute('''
-            SELECT 1 FROM attendance 
-            WHERE id = ? AND date = ?
-        ''', (student_id, date))
-        if cursor.fetchone() is None:
-            cursor.execute('''
+    def mark_attendance_batch(self, students):
+        """Mark attendance for (student_id, name) pairs in one transaction
+
+        Returns the (id, name, date, time) records newly inserted today.
+        """
+        now = datetime.datetime.now().isoformat(sep=' ', timespec='seconds')
+        date, time_str = now[:10], now[11:]
+        
+        with self._transaction() as conn:
+            # Check everyone against today's attendance with a single query
+            placeholders = ','.join('?' * len(students))
+            already_marked = {row[0] for row in conn.execute(
+                f'SELECT id FROM attendance WHERE date = ? AND id IN ({placeholders})',
+                (date, *(student_id for student_id, _ in students))
+            )}
+            new = [(student_id, name, date, time_str) for student_id, name in students
+                   if student_id not in already_marked]
+            
+            conn.executemany('''
                 INSERT INTO attendance (id, name, date, time)
                 VALUES (?, ?, ?, ?)
-            ''', (student_id, name, date, time_str))
-            
-            # Update last attendance in students table
-            cursor.execute('''
+            ''', new)
+            conn.executemany('''
                 UPDATE students 
                 SET last_attendance = ?
                 WHERE id = ?
-            ''', (f"{date} {time_str}", student_id))
-            
-            return True
-        return False
+            ''', [(now, record[0]) for record in new])
+        return new
     
-    def _get_student_name(self, cursor, student_id):
+    def get_student_name(self, student_id):
         """Get student name by ID"""
-        cursor.execute('SELECT name FROM students WHERE id = ?', (student_id,))
-        result = cursor.fetchone()
+        result = self._conn().execute(
+            'SELECT name FROM students WHERE id = ?', (student_id,)
+        ).fetchone()
         return result[0] if result else None
     
-    def _get_student_by_id(self, cursor, student_id):
-        """Get student record by ID"""
-        cursor.execute('SELECT id, name FROM students WHERE id = ?', (student_id,))
-        return cursor.fetchone()
-    
-    def _get_attendance_records(self, cursor, date=None):
+    def get_attendance_records(self, date=None):
         """Get attendance records for a specific date or all dates"""
         if date:
-            cursor.execute('''
+            return self._conn().execute('''
                 SELECT id, name, date, time FROM attendance 
                 WHERE date = ?
                 ORDER BY time DESC
-            ''', (date,))
-        else:
-            cursor.execute('''
-                SELECT id, name, date, time FROM attendance 
-                ORDER BY date DESC, time DESC
-            ''')
-        return cursor.fetchall()
+            ''', (date,)).fetchall()
+        return self._conn().execute('''
+            SELECT id, name, date, time FROM attendance 
+            ORDER BY date DESC, time DESC
+        ''').fetchall()
     
-    def _get_all_students(self, cursor):
+    def get_all_students(self):
         """Get all registered students"""
-        cursor.execute('SELECT id, name FROM students ORDER BY name')
-        return cursor.fetchall()
-    
-    def _verify_admin(self, cursor, username, password):
-        """Verify admin credentials"""
-        cursor.execute('''
-            SELECT 1 FROM admin 
-            WHERE username = ? AND password = ?
-        ''', (username, password))
-        return cursor.fetchone() is not None
-    
-    def _change_admin_password(self, cursor, username, new_password):
-        """Change admin password"""
-        cursor.execute('''
-            UPDATE admin 
-            SET password = ?
-            WHERE username = ?
-        ''', (new_password, username))
+        return self._conn().execute(
+            'SELECT id, name FROM students ORDER BY name'
+        ).fetchall()
+    
+    def get_admin_password_hash(self, username):
+        """Return the stored argon2 hash for an admin, or None if there is no such admin"""
+        row = self._conn().execute(self.VERIFY_ADMIN_SQL, (username,)).fetchone()
+        return row[0] if row else None
+    
+    @staticmethod
+    def check_admin_password(password_hash, password):
+        """Check a password against a stored argon2 hash"""
+        if password_hash is None:
+            return False
+        try:
+            return password_hasher.verify(password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    
+    def verify_admin(self, username, password):
+        """Verify admin credentials against the stored argon2 hash"""
+        return self.check_admin_password(self.get_admin_password_hash(username), password)
+    
+    def change_admin_password(self, username, new_password):
+        """Change admin password, storing only its argon2 hash"""
+        cursor = self._conn().execute(
+            self.CHANGE_ADMIN_PASSWORD_SQL, (password_hasher.hash(new_password), username)
+        )
         return cursor.rowcount > 0
     
     def close(self):
-        """Cleanly shutdown the database worker"""
-        self.db_queue.put('STOP')
-        self.worker_thread.join()
+        """Close every connection opened by this database"""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+            self._idle_connections.clear()
+
+class Toast(tk.Toplevel):
+    """Borderless notification window, reused for every message and hidden after a delay"""
+    COLORS = {'ok': '#006400', 'err': '#8b0000'}
+    DURATION = 2000  # Milliseconds a message stays up
+    
+    def __init__(self, master):
+        super().__init__(master)
+        self.overrideredirect(True)
+        self.attributes('-topmost', True)
+        self.withdraw()
+        self.label = tk.Label(self, fg='white', font=('Arial', 11, 'bold'), padx=20, pady=10)
+        self.label.pack()
+        self._hide_job = None
+    
+    def show(self, kind, text):
+        """Show text near the bottom of the main window, styled by kind ('ok' or 'err')"""
+        self.label.configure(text=text, bg=self.COLORS[kind])
+        if self._hide_job is not None:
+            self.after_cancel(self._hide_job)
+        
+        self.update_idletasks()
+        master = self.master
+        x = master.winfo_rootx() + (master.winfo_width() - self.winfo_reqwidth()) // 2
+        y = master.winfo_rooty() + master.winfo_height() - self.winfo_reqheight() - 40
+        self.geometry(f"+{x}+{y}")
+        self.deiconify()
+        self.lift()
+        self._hide_job = self.after(self.DURATION, self.hide)
+    
+    def hide(self):
+        """Hide the toast until the next message"""
+        self._hide_job = None
+        self.withdraw()
 
 class SpiderWebBackground(tk.Canvas):
-    def _init_(self, master, **kwargs):
-        super()._init_(master, **kwargs)
+    SOUND_REPEAT_INTERVAL = 0.3  # Seconds before the same sound may play again
+    
+    def __init__(self, master, **kwargs):
+        super().__init__(master, **kwargs)
         self.configure(bg='#0a0a0a', highlightthickness=0)
         self.web_center_x = self.winfo_reqwidth() // 2
         self.web_center_y = self.winfo_reqheight() // 2
@@ -224,90 +342,79 @@ class SpiderWebBackground(tk.Canvas):
         self.spider_position = [50, 750]
         self.spider_direction = [1, -1]  # x, y direction
         self.animate_spider = False
-        self.particles = []
+        self.sound_data = {}  # File name -> WAV bytes, filled by AttendanceSystem.load_sounds
+        self._last_sound = {}  # Sound name -> monotonic time it last played
+        # Particle state as parallel arrays: Tk item ids, fixed-point positions, velocities.
+        # Velocities are two's-complement int16 stored as uint16, so adding them wraps.
+        self.pids = []
+        self.px = np.empty(0, dtype=np.uint16)
+        self.py = np.empty(0, dtype=np.uint16)
+        self.pdx = np.empty(0, dtype=np.uint16)
+        self.pdy = np.empty(0, dtype=np.uint16)
         self.draw_web()
         self.create_spider()
         self.create_particles(30)
         
     def draw_web(self):
-        """Draw the spider web pattern"""
-        # Clear existing web
-        for line in self.web_lines:
-            self.delete(line)
-        for circle in self.web_circles:
-            self.delete(circle)
-            
-        self.web_lines = []
-        self.web_circles = []
+        """Draw the spider web pattern, moving the existing items on redraws"""
+        cx, cy = self.web_center_x, self.web_center_y
+        
+        # Radial lines (spider web strands)
+        ends = [(cx + 900 * dx, cy + 900 * dy) for dx, dy in _WEB_DIRS]
+        radii = range(100, 800, 100)
+        
+        if len(self.web_lines) == len(ends) and len(self.web_circles) == len(radii):
+            for line, (end_x, end_y) in zip(self.web_lines, ends):
+                self.coords(line, cx, cy, end_x, end_y)
+            for circle, r in zip(self.web_circles, radii):
+                self.coords(circle, cx-r, cy-r, cx+r, cy+r)
+            return
         
-        # Draw radial lines (spider web strands)
-        for angle in range(0, 360, 30):
-            end_x = self.web_center_x + 900 * np.cos(np.radians(angle))
-            end_y = self.web_center_y + 900 * np.sin(np.radians(angle))
+        # First draw: create the items
+        for end_x, end_y in ends:
             line = self.create_line(
-                self.web_center_x, self.web_center_y, end_x, end_y, 
+                cx, cy, end_x, end_y, 
                 fill='#8b0000', width=2, dash=(3, 3), tags="web"
             )
             self.web_lines.append(line)
         
         # Draw concentric circles (web spirals)
-        for r in range(100, 800, 100):
+        for r in radii:
             circle = self.create_oval(
-                self.web_center_x-r, self.web_center_y-r, 
-                self.web_center_x+r, self.web_center_y+r,
+                cx-r, cy-r, cx+r, cy+r,
                 outline='#8b0000', width=1, dash=(5, 5), tags="web"
             )
             self.web_circles.append(circle)
     
     def create_spider(self):
         """Create a simple spider graphic"""
-        try:
-            # Try to load spider image if available
-            spider_img = Image.open("spider.png").resize((100, 100))
-            self.spider_img = ImageTk.PhotoImage(spider_img)
-            self.spider = self.create_image(
-                self.spider_position[0], self.spider_position[1], 
-                image=self.spider_img, anchor="nw", tags="spider"
-            )
-        except:
-            # Fallback to drawing a simple spider
-            spider_img = Image.new('RGBA', (100, 100), (0, 0, 0, 0))
-            draw = ImageDraw.Draw(spider_img)
-            # Body
-            draw.ellipse((40, 40, 60, 60), fill='black')
-            # Head
-            draw.ellipse((45, 30, 55, 40), fill='black')
-            # Legs
-            for angle in range(0, 360, 45):
-                start_x = 50 + 10 * np.cos(np.radians(angle))
-                start_y = 50 + 10 * np.sin(np.radians(angle))
-                end_x = 50 + 30 * np.cos(np.radians(angle))
-                end_y = 50 + 30 * np.sin(np.radians(angle))
-                draw.line((start_x, start_y, end_x, end_y), fill='black', width=3)
-            
-            self.spider_img = ImageTk.PhotoImage(spider_img)
-            self.spider = self.create_image(
-                self.spider_position[0], self.spider_position[1], 
-                image=self.spider_img, anchor="nw", tags="spider"
-            )
+        self.spider_img = _build_spider_photo()
+        self.spider = self.create_image(
+            self.spider_position[0], self.spider_position[1], 
+            image=self.spider_img, anchor="nw", tags="spider"
+        )
     
     def create_particles(self, count):
         """Create floating particles for background effect"""
-        for _ in range(count):
-            x = random.randint(0, self.winfo_reqwidth())
-            y = random.randint(0, self.winfo_reqheight())
-            size = random.randint(1, 3)
-            particle = self.create_oval(
+        width, height = self.winfo_reqwidth(), self.winfo_reqheight()
+        px = np.random.randint(0, 1 << PARTICLE_BITS, count, dtype=np.uint16)
+        py = np.random.randint(0, 1 << PARTICLE_BITS, count, dtype=np.uint16)
+        sizes = np.random.randint(1, 4, count)
+        xs = (px.astype(np.uint32) * width >> PARTICLE_BITS).tolist()
+        ys = (py.astype(np.uint32) * height >> PARTICLE_BITS).tolist()
+        for x, y, size in zip(xs, ys, sizes.tolist()):
+            self.pids.append(self.create_oval(
                 x, y, x+size, y+size, 
                 fill='#8b0000', outline='', tags="particle"
-            )
-            self.particles.append({
-                'id': particle,
-                'x': x,
-                'y': y,
-                'dx': random.uniform(-0.5, 0.5),
-                'dy': random.uniform(-0.5, 0.5)
-            })
+            ))
+        self.px = np.concatenate([self.px, px])
+        self.py = np.concatenate([self.py, py])
+        # Up to half a pixel per frame, in canvas fractions
+        unit = 1 << PARTICLE_BITS
+        pdx = np.round(np.random.uniform(-0.5, 0.5, count) * unit / width).astype(np.int16)
+        pdy = np.round(np.random.uniform(-0.5, 0.5, count) * unit / height).astype(np.int16)
+        self.pdx = np.concatenate([self.pdx, pdx.view(np.uint16)])
+        self.pdy = np.concatenate([self.pdy, pdy.view(np.uint16)])
     
     def animate(self):
         """Animate the spider and particles"""
@@ -316,47 +423,54 @@ class SpiderWebBackground(tk.Canvas):
             self.spider_position[0] += self.spider_direction[0]
             self.spider_position[1] += self.spider_direction[1]
             
-            # Bounce off edges
-            if self.spider_position[0] <= 0 or self.spider_position[0] >= self.winfo_reqwidth() - 100:
+            # Bounce off edges, only while still heading outward; the spider
+            # starts below the bottom limit and would otherwise flip every frame
+            x, y = self.spider_position
+            dir_x, dir_y = self.spider_direction
+            if (x <= 0 and dir_x < 0) or (x >= self.winfo_reqwidth() - 100 and dir_x > 0):
                 self.spider_direction[0] *= -1
                 self.play_sound("bounce.wav")
-            if self.spider_position[1] <= 0 or self.spider_position[1] >= self.winfo_reqheight() - 100:
+            if (y <= 0 and dir_y < 0) or (y >= self.winfo_reqheight() - 100 and dir_y > 0):
                 self.spider_direction[1] *= -1
                 self.play_sound("bounce.wav")
             
             self.coords(self.spider, self.spider_position[0], self.spider_position[1])
         
-        # Move particles
-        for particle in self.particles:
-            particle['x'] += particle['dx']
-            particle['y'] += particle['dy']
-            
-            # Wrap around screen edges
-            if particle['x'] < 0:
-                particle['x'] = self.winfo_reqwidth()
-            elif particle['x'] > self.winfo_reqwidth():
-                particle['x'] = 0
-            if particle['y'] < 0:
-                particle['y'] = self.winfo_reqheight()
-            elif particle['y'] > self.winfo_reqheight():
-                particle['y'] = 0
-                
-            self.coords(particle['id'], particle['x'], particle['y'], 
-                       particle['x']+3, particle['y']+3)
+        # Move particles in one array update; uint16 overflow wraps them
+        # straight from one canvas edge to the opposite one
+        self.px += self.pdx
+        self.py += self.pdy
+        
+        # Tk has no vectorized coords call, so only this loop stays per particle
+        width, height = self.winfo_reqwidth(), self.winfo_reqheight()
+        xs = (self.px.astype(np.uint32) * width >> PARTICLE_BITS).tolist()
+        ys = (self.py.astype(np.uint32) * height >> PARTICLE_BITS).tolist()
+        for pid, x, y in zip(self.pids, xs, ys):
+            self.coords(pid, x, y, x+3, y+3)
         
         self.after(30, self.animate)
     
     def play_sound(self, sound_file):
-        """Play a sound effect if available"""
-        sound_path = os.path.join(SOUNDS_DIR, sound_file)
-        if os.path.exists(sound_path):
-            try:
-                winsound.PlaySound(sound_path, winsound.SND_ASYNC)
-            except:
-                pass
+        """Play a preloaded sound effect if available, skipping rapid repeats of the same one"""
+        now = time.monotonic()
+        if now - self._last_sound.get(sound_file, 0) < self.SOUND_REPEAT_INTERVAL:
+            return
+        self._last_sound[sound_file] = now
+        
+        data = self.sound_data.get(sound_file)
+        if data is not None:
+            # winsound can't play from memory asynchronously, so play on a worker thread
+            threading.Thread(target=self._play_wav, args=(data,), daemon=True).start()
+    
+    @staticmethod
+    def _play_wav(data):
+        try:
+            winsound.PlaySound(data, winsound.SND_MEMORY | winsound.SND_NODEFAULT)
+        except:
+            pass
 
 class AttendanceSystem:
-    def _init_(self, window):
+    def __init__(self, window):
         self.window = window
         self.window.title("Student Attendance System")
         self.window.geometry("1600x800")
@@ -364,11 +478,25 @@ class AttendanceSystem:
         
         # Initialize thread-safe database
         self.db = ThreadSafeDatabase()
-        self.db_lock = threading.Lock()
+        
+        # Load detection and recognition models once; class sessions reuse them
+        self.face_cascade = cv2.CascadeClassifier(HAARCASCADE_PATH)
+        # Keep capture -> gray -> detect on the GPU when this build supports it
+        self.cuda_cascade = self._load_cuda_cascade() if self._cuda_available() else None
+        if self.cuda_cascade is not None:
+            self.cuda_cascade.setScaleFactor(1.2)
+            self.cuda_cascade.setMinNeighbors(5)
+            self.cuda_cascade.setMinObjectSize((30, 30))
+        self.recognizer = None
+        self.reload_recognizer()
         
         # Admin state
         self.admin_logged_in = False
         self.admin_username = "admin"  # Default admin username
+        self._auth_cache = OrderedDict()  # Peppered credential digest -> verified hash, in LRU order
+        self._auth_cache_lock = threading.Lock()
+        self._user_locks = defaultdict(threading.Lock)  # Serializes password changes per admin
+        self._auth_pool = ThreadPoolExecutor(max_workers=2)  # Runs the KDF off the Tk thread
         
         # Create spider web background
         self.canvas = SpiderWebBackground(self.window, width=1600, height=800)
@@ -378,9 +506,33 @@ class AttendanceSystem:
         self.canvas.animate_spider = True
         self.canvas.animate()
         
+        # Non-modal notifications for the admin panel
+        self._toast = Toast(self.window)
+        
+        # Configure ttk styles once, before any widget uses them
+        style = ttk.Style()
+        style.theme_use('clam')
+        style.configure('BlackText.TEntry', 
+                      fieldbackground='#2a2a2a', 
+                      foreground='white',  # Clam honors fieldbackground, so text must be light
+                      insertbackground='white')
+        style.configure('Admin.TButton', 
+                      background='#8b0000', 
+                      foreground='white', 
+                      font=('Arial', 10, 'bold'), 
+                      borderwidth=0)
+        style.map('Admin.TButton', background=[('active', '#ff0000')])
+        
         # Setup UI
         self.setup_ui()
         
+        # Bound methods the admin callbacks use on every click
+        self._play = self.canvas.play_sound
+        self._get_user = self.admin_user_var.get
+        self._get_pass = self.admin_pass_var.get
+        self._get_new_pass = self.new_pass_var.get
+        self._set_new_pass = self.new_pass_var.set
+        
         # Sound effects
         self.load_sounds()
         
@@ -390,7 +542,38 @@ class AttendanceSystem:
         self.recognition_thread = None
         self.class_in_session = False
         self.class_end_time = None
-        self.attendance_sessions = []
+        self.attendance_sessions = set()
+        self._student_cache = {}
+        self.preview_window = None
+        self._refresh_pending = False
+        self._pending_rows = []
+        
+    @staticmethod
+    def _cuda_available():
+        """Check whether this OpenCV build can see a CUDA device"""
+        try:
+            return cv2.cuda.getCudaEnabledDeviceCount() > 0
+        except (AttributeError, cv2.error):
+            return False
+    
+    @staticmethod
+    def _load_cuda_cascade():
+        """Load the Haar cascade for the GPU, or return None if CUDA can't read it"""
+        # cuda::CascadeClassifier only reads old-format HAAR, NVBIN or LBP
+        # cascades, and the bundled XML is the newer traincascade format
+        try:
+            return cv2.cuda.CascadeClassifier.create(HAARCASCADE_PATH)
+        except cv2.error:
+            return None
+    
+    def reload_recognizer(self):
+        """Reload the trained LBPH model from disk, e.g. after retraining"""
+        if os.path.exists(TRAINNER_PATH):
+            recognizer = cv2.face.LBPHFaceRecognizer_create()
+            recognizer.read(TRAINNER_PATH)
+            self.recognizer = recognizer
+        else:
+            self.recognizer = None
         
     def load_sounds(self):
         """Ensure sound files exist or create placeholders"""
@@ -409,6 +592,13 @@ class AttendanceSystem:
                     winsound.Beep(frequency, duration)
                 except:
                     pass
+        
+        # Keep the WAV bytes in memory so playback never touches the disk
+        for sound_file in sounds:
+            sound_path = os.path.join(SOUNDS_DIR, sound_file)
+            if os.path.exists(sound_path):
+                with open(sound_path, 'rb') as f:
+                    self.canvas.sound_data[sound_file] = f.read()
     
     def setup_ui(self):
         """Create all UI elements"""
@@ -470,13 +660,6 @@ class AttendanceSystem:
             style='BlackText.TEntry'
         )
         self.name_entry.pack(fill='x', padx=20, pady=5)
-        
-        # Configure styles
-        style = ttk.Style()
-        style.configure('BlackText.TEntry', 
-                      fieldbackground='#2a2a2a', 
-                      foreground='black',  # Black text color
-                      insertbackground='black')  # Black cursor color
     
     def create_action_buttons(self):
         """Create main action buttons"""
@@ -514,6 +697,7 @@ class AttendanceSystem:
             # End the current class session
             self.class_in_session = False
             self.class_end_time = None
+            self._close_monitor_preview(self.preview_window)
             self.update_status("Class session ended")
             self.canvas.play_sound("success.wav")
         else:
@@ -521,12 +705,17 @@ class AttendanceSystem:
             duration = 5  # Default duration in minutes
             self.class_in_session = True
             self.class_end_time = datetime.datetime.now() + datetime.timedelta(minutes=duration)
-            self.attendance_sessions = []
+            self.attendance_sessions = set()
+            
+            # Student ID -> name for the session, so recognition doesn't query per face
+            self._student_cache = dict(self.db.get_all_students())
+            
+            preview = self._open_monitor_preview()
             
             # Start the attendance monitoring thread
             self.recognition_thread = threading.Thread(
                 target=self._monitor_class_attendance,
-                args=(duration,),
+                args=(duration, preview),
                 daemon=True
             )
             self.recognition_thread.start()
@@ -534,26 +723,43 @@ class AttendanceSystem:
             self.update_status(f"Class session started for {duration} minutes")
             self.canvas.play_sound("success.wav")
     
-    def _monitor_class_attendance(self, duration_minutes):
-        """Monitor attendance throughout the class session"""
-        recognizer = cv2.face.LBPHFaceRecognizer_create()
-        recognizer.read(TRAINNER_PATH)
+    def _monitor_class_attendance(self, duration_minutes, preview):
+        """Monitor attendance throughout the class session shown in preview"""
+        recognizer = self.recognizer
+        if recognizer is None:
+            self.update_status("Error: No trained model found. Please train the model first.")
+            self.window.after(0, self._close_monitor_preview, preview)
+            return
         
-        face_cascade = cv2.CascadeClassifier(HAARCASCADE_PATH)
-        if face_cascade.empty():
+        face_cascade = self.face_cascade
+        cuda_cascade = self.cuda_cascade
+        if cuda_cascade is None and face_cascade.empty():
             self.update_status("Error: Could not load face detection model")
+            self.window.after(0, self._close_monitor_preview, preview)
             return
             
         cam = cv2.VideoCapture(0)
         if not cam.isOpened():
             self.update_status("Error: Could not open camera")
+            self.window.after(0, self._close_monitor_preview, preview)
             return
             
+        # Let the transparent API offload color conversion and detection to OpenCL
+        cv2.ocl.setUseOpenCL(cv2.ocl.haveOpenCL())
+        
+        # Device buffers reused across captures on the CUDA path
+        if cuda_cascade is not None:
+            gpu_frame = cv2.cuda_GpuMat()
+            gpu_gray = cv2.cuda_GpuMat()
+            gpu_small = cv2.cuda_GpuMat()
+        
         end_time = time.time() + (duration_minutes * 60)
         last_capture_time = 0
         capture_interval = random.randint(10, 30)  # Random interval between 10-30 seconds
         
-        while self.class_in_session and time.time() < end_time:
+        # The session stays ours while its preview is the current one; a session
+        # ended and restarted during our sleep has a new preview
+        while self.preview_window is preview and time.time() < end_time:
             current_time = time.time()
             
             # Check if it's time for another capture
@@ -566,33 +772,55 @@ class AttendanceSystem:
                 if not ret:
                     continue
                     
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                faces = face_cascade.detectMultiScale(gray, 1.2, 5)
+                if cuda_cascade is not None:
+                    # Upload once; only the face crops come back to the host
+                    gpu_frame.upload(frame)
+                    cv2.cuda.cvtColor(gpu_frame, cv2.COLOR_BGR2GRAY, gpu_gray)
+                    cv2.cuda.resize(gpu_gray, None, gpu_small, DETECT_SCALE, DETECT_SCALE,
+                                    cv2.INTER_LINEAR)
+                    faces = cuda_cascade.convert(cuda_cascade.detectMultiScale(gpu_small))
+                else:
+                    # Convert once as a UMat; it stays on the OpenCL device through detection
+                    gray_u = cv2.cvtColor(cv2.UMat(frame), cv2.COLOR_BGR2GRAY)
+                    
+                    # Detect on a downscaled copy; recognition still uses full-res crops
+                    small = cv2.resize(gray_u, None, fx=DETECT_SCALE, fy=DETECT_SCALE,
+                                       interpolation=cv2.INTER_LINEAR)
+                    faces = face_cascade.detectMultiScale(small, 1.2, 5, minSize=(30, 30))
+                faces = [tuple(int(v / DETECT_SCALE) for v in face) for face in faces]
+                
+                if cuda_cascade is not None:
+                    rois = [cv2.cuda_GpuMat(gpu_gray, (x, y, w, h)).download()
+                            for (x, y, w, h) in faces]
+                else:
+                    gray = gray_u.get() if len(faces) else None
+                    rois = [gray[y:y+h, x:x+w] for (x, y, w, h) in faces]
                 
                 current_attendance = set()  # Track students in this capture
+                to_mark = {}  # Student ID -> name to mark after the face loop
                 
-                for (x, y, w, h) in faces:
+                for roi in rois:
                     # Recognize face
-                    id, confidence = recognizer.predict(gray[y:y+h, x:x+w])
+                    id, confidence = recognizer.predict(roi)
                     
                     if confidence < 50:  # Confidence threshold
-                        with self.db_lock:
-                            student = self.db.execute('get_student_by_id', str(id))
+                        student_id = str(id)
+                        student_name = self._student_cache.get(student_id)
                         
-                        if student:
-                            student_id, student_name = student
+                        if student_name:
                             current_attendance.add(student_id)
                             
                             # Mark attendance if not already marked in this session
                             if student_id not in self.attendance_sessions:
-                                with self.db_lock:
-                                    marked = self.db.execute('mark_attendance', student_id, student_name)
-                                
-                                if marked:
-                                    self.attendance_sessions.append(student_id)
-                                    self.window.after(0, self.refresh_attendance)
-                                    self.window.after(0, self.update_stats)
-                                    self.canvas.play_sound("capture.wav")
+                                to_mark[student_id] = student_name
+                
+                # Mark everyone recognized in this capture in one transaction
+                if to_mark:
+                    marked = self.db.mark_attendance_batch(list(to_mark.items()))
+                    if marked:
+                        self.attendance_sessions.update(record[0] for record in marked)
+                        self.window.after(0, self._schedule_attendance_refresh, marked)
+                        self.canvas.play_sound("capture.wav")
                 
                 # Update status with current attendance count
                 self.update_status(
@@ -604,18 +832,22 @@ class AttendanceSystem:
                 for (x, y, w, h) in faces:
                     cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
                 
-                cv2.imshow('Class Attendance Monitoring', frame)
-                cv2.waitKey(1000)  # Show for 1 second
-                cv2.destroyAllWindows()
+                # Tk images must be built on the main thread, so hand it the pixels
+                self.window.after(0, self._show_monitor_preview, preview,
+                                  cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
             
             time.sleep(1)  # Check every second
             
+        # Checked before the close below can clear the preview
+        timed_out = self.preview_window is preview
+        
         # Clean up
         cam.release()
-        cv2.destroyAllWindows()
+        self.db.release_connection()
+        self.window.after(0, self._close_monitor_preview, preview)
         
         # Update status
-        if self.class_in_session:  # If we exited due to time
+        if timed_out:
             self.class_in_session = False
             self.class_end_time = None
             self.update_status(
@@ -623,6 +855,52 @@ class AttendanceSystem:
             )
             self.canvas.play_sound("success.wav")
     
+    def _schedule_attendance_refresh(self, rows):
+        """Queue newly marked rows and coalesce their redraw into one pass"""
+        self._pending_rows.extend(rows)
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.window.after(500, self._do_refresh)
+    
+    def _do_refresh(self):
+        """Append the queued rows to the table and update the stats once"""
+        self._refresh_pending = False
+        rows, self._pending_rows = self._pending_rows, []
+        for row in rows:
+            self.refresh_attendance_append(row)
+        self.update_stats()
+    
+    def refresh_attendance_append(self, row):
+        """Insert a newly marked (id, name, date, time) row without re-querying"""
+        # The table only shows the selected date; a date change does a full refresh
+        if row[2] == self.date_var.get():
+            self.attendance_tree.insert('', 0, values=row)
+    
+    def _open_monitor_preview(self):
+        """Open the window showing the latest class session capture and return it"""
+        preview = tk.Toplevel(self.window)
+        preview.title("Class Attendance Monitoring")
+        preview.protocol("WM_DELETE_WINDOW", self.toggle_class_session)
+        preview.label = tk.Label(preview, bg='black')
+        preview.label.pack()
+        self.preview_window = preview
+        return preview
+    
+    def _show_monitor_preview(self, preview, frame_rgb):
+        """Display an RGB capture in a session's monitoring window"""
+        if preview is not self.preview_window:
+            return
+        photo = ImageTk.PhotoImage(Image.fromarray(frame_rgb))
+        preview.label.configure(image=photo)
+        preview.label.image = photo  # Keep a reference so Tk doesn't drop it
+    
+    def _close_monitor_preview(self, preview):
+        """Close a session's monitoring window, leaving any newer session's alone"""
+        if preview is None or preview is not self.preview_window:
+            return
+        preview.destroy()
+        self.preview_window = None
+    
     def create_attendance_display(self):
         """Create the attendance display area"""
         # Attendance frame
@@ -699,6 +977,11 @@ class AttendanceSystem:
         # Admin frame
         admin_frame = tk.Frame(self.window, bg='#1a1a1a', bd=2, relief='groove')
         admin_frame.place(x=1000, y=120, width=500, height=400)
+        # The frame has a fixed size, so packing children needn't ask the placer to resize it
+        admin_frame.pack_propagate(False)
+        
+        # Widgets enabled only while an admin is logged in
+        self._admin_widgets = []
         
         tk.Label(
             admin_frame, text="ADMIN PANEL", 
@@ -738,21 +1021,18 @@ class AttendanceSystem:
         login_frame = tk.Frame(admin_frame, bg='#1a1a1a')
         login_frame.pack(fill='x', padx=20, pady=5)
         
-        self.login_btn = tk.Button(
+        self.login_btn = ttk.Button(
             login_frame, text="🔓 Login", 
-            command=self.admin_login,
-            bg='#8b0000', fg='white', font=('Arial', 10, 'bold'),
-            bd=0, padx=5, pady=2
+            command=self.admin_login, style='Admin.TButton'
         )
         self.login_btn.pack(side='left', expand=True)
         
-        self.logout_btn = tk.Button(
+        self.logout_btn = ttk.Button(
             login_frame, text="🔒 Logout", 
-            command=self.admin_logout,
-            bg='#8b0000', fg='white', font=('Arial', 10, 'bold'),
-            bd=0, padx=5, pady=2, state='disabled'
+            command=self.admin_logout, style='Admin.TButton', state='disabled'
         )
         self.logout_btn.pack(side='right', expand=True)
+        self._admin_widgets.append(self.logout_btn)
         
         # Change password frame
         pass_frame = tk.Frame(admin_frame, bg='#1a1a1a')
@@ -772,13 +1052,12 @@ class AttendanceSystem:
             style='BlackText.TEntry'
         ).pack(side='left', fill='x', expand=True, padx=5)
         
-        self.change_pass_btn = tk.Button(
+        self.change_pass_btn = ttk.Button(
             pass_frame, text="🔄 Change", 
-            command=self.change_admin_password,
-            bg='#8b0000', fg='white', font=('Arial', 10, 'bold'),
-            bd=0, padx=5, pady=2, state='disabled'
+            command=self.change_admin_password, style='Admin.TButton', state='disabled'
         )
         self.change_pass_btn.pack(side='right', padx=5)
+        self._admin_widgets.append(self.change_pass_btn)
         
         # Admin status
         self.admin_status_label = tk.Label(
@@ -788,88 +1067,155 @@ class AttendanceSystem:
         self.admin_status_label.pack(fill='x', padx=20, pady=5)
         
         # Admin functions (initially disabled)
-        button_style = {
-            'bg': '#8b0000', 'fg': 'white', 'activebackground': '#ff0000',
-            'font': ('Arial', 10, 'bold'), 'bd': 0, 'state': 'disabled'
-        }
+        button_style = {'style': 'Admin.TButton', 'state': 'disabled'}
         
-        self.student_list_btn = tk.Button(
+        self.student_list_btn = ttk.Button(
             admin_frame, text="📋 Student List", 
             command=self.show_student_list, **button_style
         )
         self.student_list_btn.pack(fill='x', padx=20, pady=5)
+        self._admin_widgets.append(self.student_list_btn)
         
-        self.refresh_data_btn = tk.Button(
+        self.refresh_data_btn = ttk.Button(
             admin_frame, text="🔄 Refresh Data", 
             command=self.refresh_all_data, **button_style
         )
         self.refresh_data_btn.pack(fill='x', padx=20, pady=5)
+        self._admin_widgets.append(self.refresh_data_btn)
         
-        self.reset_system_btn = tk.Button(
+        self.reset_system_btn = ttk.Button(
             admin_frame, text="⚠ Reset System", 
             command=self.reset_system, **button_style
         )
         self.reset_system_btn.pack(fill='x', padx=20, pady=5)
+        self._admin_widgets.append(self.reset_system_btn)
         
         # Exit button (always available)
-        tk.Button(
+        ttk.Button(
             admin_frame, text="🚪 Exit", 
-            command=self.quit_window,
-            bg='#8b0000', fg='white', font=('Arial', 10, 'bold'),
-            bd=0, padx=5, pady=2
+            command=self.quit_window, style='Admin.TButton'
         ).pack(fill='x', padx=20, pady=5)
     
     def admin_login(self):
         """Verify admin credentials and enable features"""
-        username = self.admin_user_var.get()
-        password = self.admin_pass_var.get()
-        
-        try:
-            with self.db_lock:
-                valid = self.db.execute('verify_admin', username, password)
-            
-            if valid:
-                self.admin_logged_in = True
-                self.admin_username = username
-                self.update_admin_ui()
-                messagebox.showinfo("Success", "Admin privileges activated!")
-                self.canvas.play_sound("success.wav")
-            else:
-                messagebox.showerror("Error", "Invalid username or password!")
-                self.canvas.play_sound("error.wav")
-        except Exception as e:
-            messagebox.showerror("Error", f"Login failed: {str(e)}")
-            self.canvas.play_sound("error.wav")
+        username = self._get_user()
+        password = self._get_pass()
+        
+        # Verify on the auth pool so the UI stays responsive
+        self.login_btn.config(state='disabled')
+        future = self._auth_pool.submit(self._verify_admin, username, password)
+        future.add_done_callback(
+            lambda f: self.window.after(0, self._finish_admin_login, username, f)
+        )
+    
+    def _finish_admin_login(self, username, future):
+        """Apply the result of a login attempt on the UI thread"""
+        error = future.exception()
+        if error is not None:
+            self.login_btn.config(state='normal')
+            self._toast.show('err', f"Login failed: {str(error)}")
+            self._play("error.wav")
+        elif future.result():
+            self.admin_logged_in = True
+            self.admin_username = username
+            self.update_admin_ui()
+            self._toast.show('ok', "Admin privileges activated!")
+            self._play("success.wav")
+        else:
+            self.login_btn.config(state='normal')
+            self._toast.show('err', "Invalid username or password!")
+            self._play("error.wav")
+    
+    def _verify_admin(self, username, password):
+        """Verify admin credentials, skipping the KDF for recently verified ones"""
+        key = hmac.new(_AUTH_PEPPER, username.encode() + b'\0' + password.encode(),
+                       'sha256').digest()
+        # A cached login only counts while the stored hash is unchanged, so a password
+        # change made by any process sharing the database invalidates it
+        stored_hash = self.db.get_admin_password_hash(username)
+        with self._auth_cache_lock:
+            if stored_hash is not None and self._auth_cache.get(key) == stored_hash:
+                self._auth_cache.move_to_end(key)
+                return True
+        
+        if not self.db.check_admin_password(stored_hash, password):
+            time.sleep(AUTH_FAILURE_DELAY)  # Failures are never cached, so guessing stays slow
+            return False
+        
+        with self._auth_cache_lock:
+            self._auth_cache[key] = stored_hash
+            if len(self._auth_cache) > AUTH_CACHE_SIZE:
+                self._auth_cache.popitem(last=False)
+        return True
     
     def admin_logout(self):
         """Disable admin features"""
         self.admin_logged_in = False
         self.update_admin_ui()
-        messagebox.showinfo("Info", "Admin privileges deactivated")
-        self.canvas.play_sound("success.wav")
+        self._toast.show('ok', "Admin privileges deactivated")
+        self._play("success.wav")
     
     def change_admin_password(self):
         """Change admin password"""
         if not self.admin_logged_in:
-            messagebox.showwarning("Access Denied", "Admin login required!")
+            self._toast.show('err', "Admin login required!")
             return
             
-        new_password = self.new_pass_var.get()
+        new_password = self._get_new_pass()
         if not new_password:
-            messagebox.showwarning("Error", "Please enter a new password!")
+            self._toast.show('err', "Please enter a new password!")
+            return
+        if not _PW_POLICY.match(new_password):
+            self._toast.show('err', "Password needs 8+ characters, an uppercase letter and a digit!")
             return
             
-        try:
-            with self.db_lock:
-                success = self.db.execute('change_admin_password', 
+        # Hash and update on the auth pool; the disabled button blocks double submits
+        self.change_pass_btn.configure(state='disabled')
+        future = self._auth_pool.submit(self._do_change_admin_password,
                                         self.admin_username, new_password)
-            
+        future.add_done_callback(
+            lambda f: self.window.after(0, self._finish_change_admin_password, f)
+        )
+    
+    def _do_change_admin_password(self, username, new_password):
+        """Store the new admin password and drop cached logins for the old one"""
+        with self._auth_cache_lock:
+            user_lock = self._user_locks[username]
+        
+        # Logins never take this lock; it only orders concurrent changes to one account
+        with user_lock:
+            success = self.db.change_admin_password(username, new_password)
             if success:
-                messagebox.showinfo("Success", "Password changed successfully!")
-                self.canvas.play_sound("success.wav")
-                self.new_pass_var.set("")  # Clear password field
-            else:
-                messagebox.showerror("Error", "Failed to change password!")
-                self.canvas.play_sound("error.wav")
-        except Exception as e:
-            messagebox.showerror("Error",
\ No newline at end of file
+                with self._auth_cache_lock:
+                    self._auth_cache.clear()  # The old password must not log in from cache
+        return success
+    
+    def _finish_change_admin_password(self, future):
+        """Apply the result of a password change on the UI thread"""
+        if self.admin_logged_in:
+            self.change_pass_btn.configure(state='normal')
+        
+        error = future.exception()
+        if error is not None:
+            self._toast.show('err', f"Password change failed: {str(error)}")
+            self._play("error.wav")
+        elif future.result():
+            self._toast.show('ok', "Password changed successfully!")
+            self._play("success.wav")
+            self._set_new_pass("")  # Clear password field
+        else:
+            self._toast.show('err', "Failed to change password!")
+            self._play("error.wav")
+    
+    def update_admin_ui(self):
+        """Update admin UI based on login state"""
+        state = 'normal' if self.admin_logged_in else 'disabled'
+        for widget in self._admin_widgets:
+            widget.configure(state=state)
+        
+        # Enable/disable login button inversely
+        self.login_btn.configure(state='disabled' if self.admin_logged_in else 'normal')
+        
+        status = "Status: Logged In" if self.admin_logged_in else "Status: Not Logged In"
+        color = "#00ff00" if self.admin_logged_in else "#ff0000"
+        self.admin_status_label.configure(text=status, fg=color)